@@ -1,13 +1,62 @@
+import hashlib
+import inspect
 import os
-from typing import Optional
-import pickle
+import tempfile
+from typing import Any, Optional
+import numpy as np
 from skimage import io
+import tifffile
 import napari
 
+from cut_detector import __version__
 from cut_detector.data.tools import get_data_path
 from cut_detector.factories.results_saving_factory import ResultsSavingFactory
-from cut_detector.utils.cell_track import CellTrack
 from cut_detector.utils.mitosis_track import MitosisTrack
+from cut_detector.utils.pickle_tools import (
+    get_consolidated_path,
+    load_cell_tracks,
+    load_pickles,
+    load_segmentation_results,
+)
+
+# Increment when the format of cached layers changes
+LAYERS_CACHE_VERSION = 1
+
+
+def get_layers_cache_path(
+    cache_dir: str, input_paths: list[str], parameters: dict[str, Any]
+) -> str:
+    """Get path of cached layers, depending on inputs and their modification
+    times, generation parameters and code version, so that cache is
+    invalidated when any of them changes.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Directory where layers are cached.
+    input_paths : list[str]
+        Input files or directories, including source files of the code
+        generating layers.
+    parameters : dict[str, Any]
+        Parameters used to generate layers.
+
+    Returns
+    -------
+    str
+        Path of the cached layers.
+    """
+    key = hashlib.blake2b(digest_size=16)
+    key.update(f"{LAYERS_CACHE_VERSION};{__version__};".encode())
+    for name, value in sorted(parameters.items()):
+        key.update(f"{name}={value!r};".encode())
+    for input_path in input_paths:
+        paths = [input_path]
+        if os.path.isdir(input_path):
+            paths += sorted(entry.path for entry in os.scandir(input_path))
+        for path in paths:
+            if os.path.exists(path):
+                key.update(f"{path}:{os.stat(path).st_mtime_ns};".encode())
+    return os.path.join(cache_dir, f"{key.hexdigest()}.npz")
 
 
 def main(
@@ -20,6 +69,8 @@ def main(
     ),
     tracks_dir: Optional[str] = get_data_path("tracks"),
     video_name="example_video",
+    headless: bool = False,
+    cache_dir: str = os.path.join(tempfile.gettempdir(), "cut_detector"),
 ) -> None:
     """
     Parameters
@@ -30,45 +81,85 @@ def main(
         Path to the mitoses, by default mitoses.
     segmentation_results_path : str
         Path to the segmentation results, by default example_video.bin.
+    headless : bool
+        If True, only compute masks, without creating any Napari viewer.
+    cache_dir : str
+        Directory where computed layers are cached.
     """
 
     # Create a Napari viewer
-    viewer = napari.Viewer()
+    viewer = None if headless else napari.Viewer()
 
-    # Load Cellpose results
-    with open(segmentation_results_path, "rb") as f:
-        cellpose_results = pickle.load(f)  # TYX
-
-    # Load cell tracks
-    cell_tracks: list[CellTrack] = []
-    video_tracks_save_dir = os.path.join(tracks_dir, video_name)
-    for state_path in os.listdir(video_tracks_save_dir):
-        with open(os.path.join(video_tracks_save_dir, state_path), "rb") as f:
-            cell_track = CellTrack.load(f)
-            cell_tracks.append(cell_track)
-
-    # Add video
-    video = io.imread(image_path)  # TYXC
+    # Add video, memory-mapped so that frames are read on demand
+    try:
+        video = tifffile.memmap(image_path, mode="r")  # TYXC
+    except ValueError:  # compressed files can not be memory-mapped
+        video = io.imread(image_path)  # TYXC
 
     # Match Napari video display
-    viewer.add_image(video, name="example_video", rgb=True)
-
-    # Load mitosis tracks
-    mitosis_tracks = []
-    for state_path in os.listdir(mitoses_path):
-        with open(os.path.join(mitoses_path, state_path), "rb") as f:
-            mitosis_track = MitosisTrack.load(f)
-        mitosis_tracks.append(mitosis_track)
-
-    ResultsSavingFactory().generate_napari_tracking_mask(
-        mitosis_tracks,
-        video,
-        viewer,
-        segmentation_results=cellpose_results,
-        cell_tracks=cell_tracks,
+    if viewer is not None:
+        viewer.add_image(video, name="example_video", rgb=True)
+
+    # Reuse layers computed by a previous run on the same inputs
+    video_tracks_dir = os.path.join(tracks_dir, video_name)
+    os.makedirs(cache_dir, exist_ok=True)
+    factory = ResultsSavingFactory()
+    cache_path = get_layers_cache_path(
+        cache_dir,
+        [
+            image_path,
+            mitoses_path,
+            segmentation_results_path,
+            video_tracks_dir,
+            get_consolidated_path(video_tracks_dir),
+            # Code generating layers, categories and legend
+            inspect.getfile(ResultsSavingFactory),
+            inspect.getfile(MitosisTrack),
+        ],
+        {
+            "video_name": video_name,
+            "max_frame": factory.max_frame,
+            **vars(factory.params),
+        },
     )
 
-    napari.run()
+    if os.path.exists(cache_path):
+        with np.load(cache_path) as cached_layers:
+            layers = dict(cached_layers)
+    else:
+        # Load Cellpose results
+        cellpose_results = load_segmentation_results(
+            segmentation_results_path
+        )  # TYX
+
+        # Load cell tracks
+        cell_tracks = load_cell_tracks(tracks_dir, video_name)
+
+        # Load mitosis tracks
+        mitosis_tracks = load_pickles(mitoses_path, MitosisTrack.load)
+
+        layers = factory.get_napari_tracking_layers(
+            mitosis_tracks,
+            video,
+            segmentation_results=cellpose_results,
+            cell_tracks=cell_tracks,
+        )
+        # Categories are strings, save them with an explicit dtype so that
+        # they can be loaded without pickle
+        layers["mid_body_categories"] = layers["mid_body_categories"].astype(
+            str
+        )
+        # Object arrays can not be loaded safely, do not cache them
+        if all(layer.dtype != object for layer in layers.values()):
+            np.savez(cache_path, **layers)
+
+    if viewer is not None:
+        factory.add_napari_tracking_layers(
+            viewer, layers, rgb=np.argmin(video.shape) == 3
+        )
+
+    if not headless:
+        napari.run()
 
 
 if __name__ == "__main__":
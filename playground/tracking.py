@@ -1,7 +1,6 @@
 """Playground to run cell tracking."""
 
 import os
-import pickle
 from typing import Optional
 import matplotlib.pyplot as plt
 import numpy as np
@@ -10,6 +9,7 @@ from cut_detector.data.tools import get_data_path
 from cut_detector.factories.segmentation_tracking_factory import (
     SegmentationTrackingFactory,
 )
+from cut_detector.utils.pickle_tools import load_segmentation_results
 
 
 def main(
@@ -24,8 +24,9 @@ def main(
         Path to the segmentation results, to avoid executing cellpose here.
     """
     # Load Cellpose results
-    with open(segmentation_results_path, "rb") as f:
-        cellpose_results = pickle.load(f)  # TYX
+    cellpose_results = load_segmentation_results(
+        segmentation_results_path
+    )  # TYX
 
     # Perform tracking from Cellpose results
     factory = SegmentationTrackingFactory("")
@@ -34,22 +35,38 @@ def main(
         diam_labels=164,  # hardcoded since normally included in Cellpose model
     )
 
-    # Display results
+    # Gather spots as arrays once, instead of filtering the list each frame
+    spots_frames = np.array([cell.frame for cell in cell_spots])
+    points_offsets = np.cumsum(
+        [0] + [len(cell.spot_points) for cell in cell_spots]
+    )
+    # Leading empty array keeps concatenation valid without any spot
+    spots_points = np.concatenate(
+        [np.empty((0, 2), dtype=int)]
+        + [np.array(cell.spot_points) for cell in cell_spots]
+    )
+    spots_centroids = np.array([[cell.x, cell.y] for cell in cell_spots])
+
+    # Display results, one figure per frame
     for frame, cellpose_result in enumerate(cellpose_results):
-        frame_cells = [cell for cell in cell_spots if cell.frame == frame]
-        plt.imshow(cellpose_result)
-        for local_cell in frame_cells:
-            points = np.array(local_cell.spot_points)
-            plt.plot(
+        frame_indexes = np.nonzero(spots_frames == frame)[0]
+        _, ax = plt.subplots()
+        ax.imshow(cellpose_result, cmap="tab20", interpolation="nearest")
+        for idx in frame_indexes:
+            points = spots_points[
+                points_offsets[idx] : points_offsets[idx + 1]
+            ]
+            ax.plot(
                 points[:, 0],
                 points[:, 1],
                 "o",
             )
-            plt.plot(
-                local_cell.x,
-                local_cell.y,
-                "x",
-            )
+        # All centroids at once
+        ax.plot(
+            spots_centroids[frame_indexes, 0],
+            spots_centroids[frame_indexes, 1],
+            "x",
+        )
         plt.show()
 
 
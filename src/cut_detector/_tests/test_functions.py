@@ -1,3 +1,19 @@
+import numpy as np
+from scipy import ndimage
+from scipy.spatial import distance
+from skimage.morphology import extrema, opening
+
+from cut_detector.factories.mid_body_detection_factory import (
+    MidBodyDetectionFactory,
+)
+from cut_detector.utils.mid_body_detection.detection import (
+    detect_h_maxima,
+    opening_3x3,
+)
+from cut_detector.utils.mid_body_detection.tracking import (
+    spatial_intensity_dist,
+    spatial_intensity_dist_matrix,
+)
 from cut_detector.utils.mid_body_spot import MidBodySpot
 from cut_detector.utils.mid_body_track import MidBodyTrack
 
@@ -42,3 +58,135 @@ def test_mid_body_track_fill_gaps_all():
     assert track.spots[1].x == 1
     assert track.spots[3].x == 3
     assert track.spots[4].x == 4
+
+
+def test_mid_body_track_spots_arrays_after_fill_gaps():
+    """Filled spots are added at the end of the track, but spots arrays
+    are sorted by frame."""
+    track = MidBodyTrack(0)
+    track.add_spot(MidBodySpot(0, x=0, y=10))
+    track.add_spot(MidBodySpot(3, x=3, y=13))
+    track.fill_gaps()
+
+    frames, positions = track.get_spots_arrays()
+    assert frames.tolist() == [0, 1, 2, 3]
+    assert positions.tolist() == [[10, 0], [11, 1], [12, 2], [13, 3]]
+
+
+def _reference_spatial_intensity_dist(
+    c1, c2, max_distance, mklp_weight_factor, sir_weight_factor
+):
+    """Original pure Python version of spatial_intensity_dist."""
+    (x1, y1, mlkp1, sir1), (x2, y2, mlkp2, sir2) = c1, c2
+    if np.isnan([x1, y1, x2, y2]).any():
+        return max_distance * 2
+    spatial_e = distance.euclidean([x1, y1], [x2, y2])
+    mklp_penalty = (
+        3 * mklp_weight_factor * np.abs(mlkp1 - mlkp2) / (mlkp1 + mlkp2)
+    )
+    sir_penalty = 3 * sir_weight_factor * np.abs(sir1 - sir2) / (sir1 + sir2)
+    penalty = 1 + mklp_penalty + sir_penalty
+    return (spatial_e * penalty) ** 2
+
+
+def test_spatial_intensity_dist_matrix():
+    """Compiled and vectorized distances match the original metric, up to
+    floating point rounding, and invalidate the same NaN points."""
+    rng = np.random.default_rng(0)
+    coords1 = rng.uniform(1, 100, (20, 4))
+    coords2 = rng.uniform(1, 100, (30, 4))
+    coords1[3, 0] = np.nan
+    coords2[[5, 7], 1] = np.nan
+    parameters = {
+        "max_distance": 175,
+        "mklp_weight_factor": 5.0,
+        "sir_weight_factor": 1.5,
+    }
+
+    expected = np.array(
+        [
+            [
+                _reference_spatial_intensity_dist(c1, c2, **parameters)
+                for c2 in coords2
+            ]
+            for c1 in coords1
+        ]
+    )
+    scalar = np.array(
+        [
+            [spatial_intensity_dist(c1, c2, **parameters) for c2 in coords2]
+            for c1 in coords1
+        ]
+    )
+    matrix = spatial_intensity_dist_matrix(coords1, coords2, **parameters)
+
+    invalid = expected == parameters["max_distance"] * 2
+    assert invalid.sum() == 30 + 2 * 19
+    for distances in (scalar, matrix):
+        assert np.array_equal(
+            distances == parameters["max_distance"] * 2, invalid
+        )
+        assert np.allclose(distances, expected, rtol=1e-12, atol=0)
+
+
+def _get_test_image() -> np.ndarray:
+    """Noisy image with a few bright spots, some touching image borders."""
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 50, (100, 120)).astype(np.uint16)
+    for y, x in [(20, 30), (50, 60), (80, 15), (0, 100), (99, 119)]:
+        image[max(y - 2, 0) : y + 3, max(x - 2, 0) : x + 3] += 200
+    return image
+
+
+def test_detect_h_maxima():
+    """Vectorized h-maxima detection matches the original label loop."""
+    image = _get_test_image()
+
+    # Original implementation
+    filtered_image = opening(image, footprint=np.ones((3, 3)))
+    local_maxima = extrema.h_maxima(filtered_image, 5.0)
+    labeled_local_maxima, nb_labels = ndimage.label(
+        local_maxima, structure=np.ones((3, 3))
+    )
+    filtering_threshold = np.quantile(image.flatten(), 0.99)
+    for label in range(1, nb_labels + 1):
+        if (
+            image[np.where(labeled_local_maxima == label)].mean()
+            < filtering_threshold
+        ):
+            labeled_local_maxima[labeled_local_maxima == label] = 0
+    labeled_local_maxima, nb_labels = ndimage.label(
+        labeled_local_maxima > 0, structure=np.ones((3, 3))
+    )
+    expected_spots = np.asarray(
+        ndimage.center_of_mass(
+            local_maxima, labeled_local_maxima, range(1, nb_labels + 1)
+        ),
+        dtype=np.int64,
+    )
+
+    assert np.array_equal(opening_3x3(image), filtered_image)
+    spots = detect_h_maxima(image)
+    assert len(spots) > 0
+    assert np.array_equal(spots, expected_spots)
+
+
+def test_get_average_intensities():
+    """Batched intensities match per-spot intensities, borders included."""
+    image = _get_test_image()
+    positions = [(20, 30, 5), (0, 100, 5), (99, 119, 5), (0, 0, 5)]
+
+    for margin in (1, 2):
+        expected = [
+            MidBodyDetectionFactory._get_average_intensity(
+                position, image, margin
+            )
+            for position in positions
+        ]
+        assert (
+            MidBodyDetectionFactory._get_average_intensities(
+                positions, image, margin
+            )
+            == expected
+        )
+    assert MidBodyDetectionFactory._get_average_intensities([], image) == []
@@ -0,0 +1,114 @@
+import os
+import pickle
+
+import numpy as np
+
+from cut_detector.utils.cell_spot import CellSpot
+from cut_detector.utils.cell_track import CellTrack
+from cut_detector.utils.pickle_tools import (
+    consolidate_cell_tracks,
+    consolidate_pickles,
+    convert_segmentation_results,
+    get_consolidated_path,
+    load_cell_tracks,
+    load_segmentation_results,
+)
+
+
+def _save_legacy_cell_track(path: str, rename_classes=True) -> None:
+    """Save a cell track as an older version would have: TrackMate class
+    names, "track_spots" instead of "spots" and no metaphase sequences."""
+    cell_track = CellTrack(0, {0}, 0, 0)
+    cell_track.add_spot(CellSpot(0, 1, 2, 0, 0, 2, 0, 4, [[1, 2]]))
+    cell_track.track_spots = cell_track.spots
+    del cell_track.spots
+    del cell_track.metaphase_sequences
+    data = pickle.dumps(cell_track, protocol=0)
+    if not rename_classes:
+        with open(path, "wb") as f:
+            f.write(data)
+        return
+    data = data.replace(
+        b"cut_detector.utils.cell_track\nCellTrack",
+        b"pasteur.trackmate.utils.TrackMateTrack\nTrackMateTrack",
+    ).replace(
+        b"cut_detector.utils.cell_spot\nCellSpot",
+        b"pasteur.trackmate.utils.TrackMateSpot\nTrackMateSpot",
+    )
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def test_load_consolidated_legacy_cell_tracks(tmp_path):
+    """Legacy cell tracks are the same, consolidated or not."""
+    video_tracks_dir = os.path.join(tmp_path, "video")
+    os.makedirs(video_tracks_dir)
+    _save_legacy_cell_track(os.path.join(video_tracks_dir, "track_0.bin"))
+
+    (per_file_track,) = load_cell_tracks(tmp_path, "video")
+    consolidated_path = consolidate_cell_tracks(tmp_path, "video")
+    assert consolidated_path == get_consolidated_path(video_tracks_dir)
+    (consolidated_track,) = load_cell_tracks(tmp_path, "video")
+
+    for cell_track in (per_file_track, consolidated_track):
+        assert isinstance(cell_track, CellTrack)
+        assert cell_track.metaphase_sequences == []
+        assert isinstance(cell_track.spots[0], CellSpot)
+    assert consolidated_track.spots.keys() == per_file_track.spots.keys()
+    assert consolidated_track.spots[0].x == per_file_track.spots[0].x
+
+
+def test_load_legacy_cell_tracks_consolidated_as_is(tmp_path):
+    """Legacy cell tracks consolidated without adaptation are adapted when
+    loaded, as when loaded one file at a time."""
+    video_tracks_dir = os.path.join(tmp_path, "video")
+    os.makedirs(video_tracks_dir)
+    _save_legacy_cell_track(
+        os.path.join(video_tracks_dir, "track_0.bin"), rename_classes=False
+    )
+
+    (per_file_track,) = load_cell_tracks(tmp_path, "video")
+    consolidate_pickles(video_tracks_dir, load_function=pickle.load)
+    (consolidated_track,) = load_cell_tracks(tmp_path, "video")
+
+    for cell_track in (per_file_track, consolidated_track):
+        assert cell_track.metaphase_sequences == []
+        assert cell_track.spots.keys() == {0}
+
+
+def test_stale_consolidated_cell_tracks_are_ignored(tmp_path):
+    """Cell tracks written after consolidation are loaded from directory."""
+    video_tracks_dir = os.path.join(tmp_path, "video")
+    os.makedirs(video_tracks_dir)
+    track_path = os.path.join(video_tracks_dir, "track_0.bin")
+    _save_legacy_cell_track(track_path, rename_classes=False)
+    consolidated_path = consolidate_cell_tracks(tmp_path, "video")
+
+    # Overwrite per-file track after consolidation
+    cell_track = CellTrack(0, {0}, 0, 1)
+    cell_track.add_spot(CellSpot(1, 3, 4, 0, 2, 4, 3, 5, [[3, 4]]))
+    with open(track_path, "wb") as f:
+        pickle.dump(cell_track, f)
+    consolidated_time = os.stat(consolidated_path).st_mtime_ns
+    os.utime(track_path, ns=(consolidated_time + 1, consolidated_time + 1))
+
+    (loaded_track,) = load_cell_tracks(tmp_path, "video")
+    assert loaded_track.spots.keys() == {1}
+
+
+def test_stale_segmentation_array_is_ignored(tmp_path):
+    """Segmentation results regenerated after conversion are loaded from
+    the pickle file."""
+    results_path = os.path.join(tmp_path, "video.bin")
+    with open(results_path, "wb") as f:
+        pickle.dump(np.zeros((2, 4, 4), dtype=np.int64), f)
+    array_path = convert_segmentation_results(results_path)
+    assert (load_segmentation_results(results_path) == 0).all()
+
+    # Regenerate pickle file after conversion
+    with open(results_path, "wb") as f:
+        pickle.dump(np.ones((2, 4, 4), dtype=np.int64), f)
+    array_time = os.stat(array_path).st_mtime_ns
+    os.utime(results_path, ns=(array_time + 10**9, array_time + 10**9))
+
+    assert (load_segmentation_results(results_path) == 1).all()
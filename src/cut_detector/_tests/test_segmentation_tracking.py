@@ -1,8 +1,15 @@
 import os
+
+import numpy as np
 from skimage import io
+from skimage.draw import disk
 
 from cut_detector._widget import segmentation_tracking
 from cut_detector.data.tools import get_data_path
+from cut_detector.factories import segmentation_tracking_factory
+from cut_detector.factories.segmentation_tracking_factory import (
+    SegmentationTrackingFactory,
+)
 from cut_detector.widget_functions.segmentation_tracking import (
     perform_tracking,
 )
@@ -23,3 +30,47 @@ def test_track_generation():
 
     assert 200 <= len(cell_spots) <= 300
     assert len(cell_tracks) in [5, 6]  # should be 5
+
+
+class SqueezingCellposeModel:
+    """Fake cellpose model, squeezing results like cellpose does.
+    Frame index is read from first pixel of the video."""
+
+    diam_labels = 30.0
+
+    def __init__(self, masks: np.ndarray):
+        self.masks = masks  # TYX
+        self.net = None
+
+    def eval(self, video: np.ndarray, **_):
+        frames = video[:, 0, 0, 0].astype(int)
+        return self.masks[frames].squeeze(), [], None
+
+
+def test_pipelined_segmentation(monkeypatch):
+    """Test pipelined segmentation with a last chunk of a single frame."""
+    masks = np.zeros((9, 64, 64), dtype=np.uint16)  # TYX
+    for frame in range(9):
+        masks[frame][disk((20 + frame, 20), 8)] = 1
+        masks[frame][disk((44, 44 - frame), 6)] = 2
+    model = SqueezingCellposeModel(masks)
+    monkeypatch.setattr(
+        segmentation_tracking_factory,
+        "load_cellpose_model",
+        lambda *_: model,
+    )
+    video = np.zeros((9, 3, 64, 64))  # TCYX
+    video[:, 0, 0, 0] = np.arange(9)
+
+    factory = SegmentationTrackingFactory("fake_model_path")
+    cellpose_results, cell_dictionary, _ = (
+        factory.perform_pipelined_segmentation(video, frames_per_chunk=8)
+    )
+
+    assert np.array_equal(cellpose_results, masks)
+    expected_dictionary = factory.get_spots_from_cellpose(masks)
+    assert list(cell_dictionary) == list(expected_dictionary)
+    for frame, spots in expected_dictionary.items():
+        assert [(spot.id, spot.x, spot.y) for spot in spots] == [
+            (spot.id, spot.x, spot.y) for spot in cell_dictionary[frame]
+        ]
@@ -1,8 +1,13 @@
 import os
+
+import pytest
 from skimage import io
 
 from cut_detector._widget import mitosis_track_generation
 from cut_detector.data.tools import get_data_path
+from cut_detector.utils.mid_body_detection.tracking import get_tracking_method
+from cut_detector.utils.mid_body_spot import MidBodySpot
+from cut_detector.utils.track_generation import generate_tracks_from_spots
 from cut_detector.widget_functions.mitosis_track_generation import (
     perform_mitosis_track_generation,
 )
@@ -38,3 +43,51 @@ def test_track_generation():
     assert (
         10 <= mitosis_track.key_events_frame["no_mt_cut"] <= 12
     )  # beginning of cytokinesis - should be 11
+
+
+def _track_mid_body_spots(
+    method_name: str, first_frame: int
+) -> list[list[tuple[int, int]]]:
+    """Track two mid-bodies over 5 frames, starting at first_frame, with an
+    empty third frame. Return tracks as sorted (frame, index in frame)
+    pairs, frames relative to first_frame."""
+    frames = [first_frame + i for i in (0, 1, 3, 4)]
+    spot_dict = {
+        frame: [
+            MidBodySpot(frame, 50 + frame, 60, 100.0, 50.0),
+            MidBodySpot(frame, 400, 300 - frame, 200.0, 80.0),
+        ]
+        for frame in frames
+    }
+    spot_dict[first_frame + 2] = []
+
+    mid_body_tracks = generate_tracks_from_spots(
+        spot_dict, get_tracking_method(method_name, spatial_resolution=172)
+    )
+
+    tracks = []
+    for track in mid_body_tracks:
+        assert all(spot.frame == frame for frame, spot in track.spots.items())
+        tracks.append(
+            sorted(
+                (frame - first_frame, spot_dict[frame].index(spot))
+                for frame, spot in track.spots.items()
+            )
+        )
+    # Each spot belongs to exactly one track
+    assert sorted(pair for track in tracks for pair in track) == sorted(
+        (frame - first_frame, idx) for frame in frames for idx in (0, 1)
+    )
+    return sorted(tracks)
+
+
+@pytest.mark.parametrize("method_name", ["laptrack", "spatial_laptrack"])
+def test_generate_tracks_from_leading_frames(method_name):
+    """Test tracking spots not starting at frame 0, with an empty frame."""
+    tracks = _track_mid_body_spots(method_name, first_frame=0)
+    assert _track_mid_body_spots(method_name, first_frame=2) == tracks
+    if method_name == "spatial_laptrack":
+        assert tracks == [
+            [(0, 0), (1, 0), (3, 0), (4, 0)],
+            [(0, 1), (1, 1), (3, 1), (4, 1)],
+        ]
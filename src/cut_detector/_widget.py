@@ -12,6 +12,7 @@ from skimage import io
 
 from .utils.cell_track import CellTrack
 from .utils.parameters import Parameters
+from .utils.pickle_tools import load_cell_tracks
 from .utils.tools import re_organize_channels
 
 from .widget_functions.segmentation_tracking import perform_tracking
@@ -474,18 +475,9 @@ def results_saving(
 ):
     params = Parameters()
     # Load cell tracks
-    cell_tracks: list[CellTrack] = []
-    # Iterate over "bin" files in exported_tracks_dir
-    video_exported_tracks_dir = os.path.join(
+    cell_tracks: list[CellTrack] = load_cell_tracks(
         exported_tracks_dir, img_layer.name
     )
-    for state_path in os.listdir(video_exported_tracks_dir):
-        # Load mitosis track
-        with open(
-            os.path.join(video_exported_tracks_dir, state_path), "rb"
-        ) as f:
-            cell_track = CellTrack.load(f)
-            cell_tracks.append(cell_track)
 
     perform_results_saving(
         exported_mitoses_dir,
@@ -1,8 +1,9 @@
 import concurrent.futures
+from functools import partial
+from itertools import repeat
+import os
 from typing import Optional
 import numpy as np
-from skimage.morphology import extrema, opening
-from scipy import ndimage
 from shapely.ops import nearest_points
 from shapely import Polygon, Point
 from tqdm import tqdm
@@ -13,7 +14,6 @@ from ..utils.mid_body_detection.detection import (
 )
 from ..utils.cell_track import CellTrack
 from ..utils.mid_body_track import MidBodyTrack
-from ..utils.image_tools import smart_cropping
 from ..utils.mid_body_spot import MidBodySpot
 from ..utils.mitosis_track import MitosisTrack
 from ..utils.track_generation import generate_tracks_from_spots
@@ -50,6 +50,7 @@ class MidBodyDetectionFactory:
         detection_method: str,
         tracking_method: str = "spatial_laptrack",
         log_blob_spot: bool = False,
+        parallel_backend: str = "thread",
     ) -> None:
         """
         Get spots of best mitosis track.
@@ -70,6 +71,8 @@ class MidBodyDetectionFactory:
             Method to track mid-body spots.
         log_blob_spot: bool
             If True, display log of spots detected.
+        parallel_backend: str
+            "thread" or "process", used if parallel_detection is True.
         """
 
         spots_candidates = self.detect_mid_body_spots(
@@ -78,6 +81,7 @@ class MidBodyDetectionFactory:
             parallelization=parallel_detection,
             log_blob_spot=log_blob_spot,
             mitosis_track=mitosis_track,
+            parallel_backend=parallel_backend,
         )
 
         mid_body_tracks: list[MidBodyTrack] = generate_tracks_from_spots(
@@ -114,6 +118,7 @@ class MidBodyDetectionFactory:
         parallelization: bool = False,
         log_blob_spot: bool = False,
         mitosis_track: Optional[MitosisTrack] = None,
+        parallel_backend: str = "thread",
     ) -> dict[int, list[MidBodySpot]]:
         """
         Detect mid-body spots in mitosis movie.
@@ -130,6 +135,10 @@ class MidBodyDetectionFactory:
             If True, display log of spots detected.
         mitosis_track: MitosisTrack
             Mitosis track to get mask positions.
+        parallel_backend: str
+            "thread" or "process", used if parallelization is True.
+            Processes avoid the GIL on the Python part of detection, at the
+            cost of sending frames to workers.
 
         Returns
         ----------
@@ -138,13 +147,23 @@ class MidBodyDetectionFactory:
         """
         assert isinstance(parallelization, bool)
 
-        if parallelization:
+        if parallelization and parallel_backend == "process":
+            mid_bodies = self.process_pool_detect_mid_body_spots(
+                mitosis_movie,
+                method,
+                mitosis_track,
+            )
+
+        elif parallelization and parallel_backend == "thread":
             mid_bodies = self.thread_pool_detect_mid_body_spots(
                 mitosis_movie,
                 method,
                 mitosis_track,
             )
 
+        elif parallelization:
+            raise ValueError(f"Unknown parallel backend: [{parallel_backend}]")
+
         else:
             mid_bodies = self.serial_detect_mid_body_spots(
                 mitosis_movie,
@@ -243,6 +262,41 @@ class MidBodyDetectionFactory:
             for res in concurrent.futures.as_completed(future_list)
         }
 
+    def process_pool_detect_mid_body_spots(
+        self,
+        mitosis_movie: np.ndarray,
+        method: str,
+        mitosis_track: Optional[MitosisTrack] = None,
+    ) -> dict[int, list[MidBodySpot]]:
+        """Detect mid-body spots in mitosis movie.
+        Parallelized version, with one process per core.
+
+        Parameters
+        ----------
+        mitosis_movie: np.ndarray
+            Mitosis movie. TYXC.
+        mode: str
+            Method to detect mid-body spots.
+        mitosis_track: MitosisTrack
+            Mitosis track to get mask positions.
+        """
+        nb_frames = mitosis_movie.shape[0]
+        frame_spot_detection = partial(
+            self._spot_detection, mitosis_track=mitosis_track
+        )
+        # Send frames by chunks to limit pickling overhead
+        chunk_size = max(1, nb_frames // (4 * (os.cpu_count() or 1)))
+
+        with concurrent.futures.ProcessPoolExecutor() as e:
+            spots = e.map(
+                frame_spot_detection,
+                mitosis_movie,
+                repeat(method),
+                range(nb_frames),
+                chunksize=chunk_size,
+            )
+            return dict(enumerate(spots))
+
     def _spot_detection(
         self,
         image: np.ndarray,
@@ -301,67 +355,35 @@ class MidBodyDetectionFactory:
                 f"Invalid type for argument mitosis_track: {mitosis_track}"
             )
 
-        if method in DETECTION_FUNCTIONS:
-            # Function called referenced by name
-            spots = [
-                (int(spot[0]), int(spot[1]), int(spot[2]))
-                for spot in DETECTION_FUNCTIONS[method](image_mklp)
-            ]
-
-            if log_blob_spot:
-                for s in spots:
-                    print(f"found x:{s[1]}  y:{s[0]}  s:{s[2]}")
-
-        elif method == "h_maxima":  # NB: old method, to be removed
-            h_maxima_threshold = 5.0
-            # Perform opening followed by closing to remove small spots
-            filtered_image = opening(image_mklp, footprint=np.ones((3, 3)))
-            # Get local maxima using h_maxima
-            local_maxima = extrema.h_maxima(filtered_image, h_maxima_threshold)
-            # Label spot regions
-            labeled_local_maxima, nb_labels = ndimage.label(
-                local_maxima, structure=np.ones((3, 3))
-            )
-            # Remove inconsistent labels
-            # Threshold is computed as 99th percentile of image
-            filtering_threshold = np.quantile(image_mklp.flatten(), 0.99)
-            for label in range(1, nb_labels + 1):
-                # Labels intensity in original image has to be higher than threshold
-                if (
-                    image_mklp[np.where(labeled_local_maxima == label)].mean()
-                    < filtering_threshold
-                ):
-                    labeled_local_maxima[labeled_local_maxima == label] = 0
-            # Re-label accordingly
-            labeled_local_maxima, nb_labels = ndimage.label(
-                labeled_local_maxima > 0, structure=np.ones((3, 3))
-            )
-            # Get center of mass to locate spots
-            spots = ndimage.center_of_mass(
-                local_maxima, labeled_local_maxima, range(1, nb_labels + 1)
-            )
-            spots = np.asarray(spots, dtype=np.int64)
+        if method not in DETECTION_FUNCTIONS:
+            raise ValueError(f"Unknown mode: [{method}]")
 
-            # Here, do something to retrieve mid_body area and/or circularity...
-            if len(spots) == 0:
-                spots = np.array([], dtype=np.int64).reshape(
-                    (0, filtered_image.ndim)
-                )
+        # Function called referenced by name
+        spots = (
+            DETECTION_FUNCTIONS[method](image_mklp).astype(np.int64).tolist()
+        )
 
-        else:
-            raise ValueError(f"Unknown mode: [{method}]")
+        if log_blob_spot:
+            for s in spots:
+                # Sigma is only given by blob-based methods
+                sigma = f"  s:{s[2]}" if len(s) > 2 else ""
+                print(f"found x:{s[1]}  y:{s[0]}{sigma}")
 
         # Spots can be a list of tuples with 2 or 3 values: 2 values: (y, x) if
         # h_maxima, 3 values: (y, x, sigma) if any blob-based method used
+        intensities = self._get_average_intensities(spots, image_mklp)
+        sir_intensities = self._get_average_intensities(spots, image_sir)
         mid_body_spots = [
             MidBodySpot(
                 frame,
                 x=position[1] + shift_x,  # switch (y, x) to (x, y)
                 y=position[0] + shift_y,
-                intensity=self._get_average_intensity(position, image_mklp),
-                sir_intensity=self._get_average_intensity(position, image_sir),
+                intensity=intensity,
+                sir_intensity=sir_intensity,
+            )
+            for position, intensity, sir_intensity in zip(
+                spots, intensities, sir_intensities
             )
-            for position in spots
         ]
 
         return mid_body_spots
@@ -386,19 +408,66 @@ class MidBodyDetectionFactory:
         int
             Average intensity of the spot.
         """
-        # Get associated crop
-        crop = smart_cropping(
-            image,
-            margin,
-            position[1],
-            position[0],
-            position[1] + 1,
-            position[0] + 1,
-        )
+        # Get associated crop, clipped to image borders
+        y, x = position[0], position[1]
+        crop = image[
+            max(y - margin, 0) : y + 1 + margin,
+            max(x - margin, 0) : x + 1 + margin,
+        ]
 
         # Return average intensity
         return int(np.mean(crop))
 
+    @classmethod
+    def _get_average_intensities(
+        cls, positions: list[tuple[int]], image: np.ndarray, margin=1
+    ) -> list[int]:
+        """Get average intensities of spots in an image, all at once.
+        Same as _get_average_intensity, applied to every position.
+
+        Parameters
+        ----------
+        positions : list[tuple[int]]
+            Spots positions. (y, x, ...).
+        image : np.ndarray
+            Image to process. YX.
+        margin : int
+            Margin around the spots to consider.
+
+        Returns
+        ----------
+        list[int]
+            Average intensities of the spots.
+        """
+        if len(positions) == 0:
+            return []
+
+        # Float sums depend on summation order, keep exact per-spot mean
+        if not np.issubdtype(image.dtype, np.integer):
+            return [
+                cls._get_average_intensity(position, image, margin)
+                for position in positions
+            ]
+
+        # Gather (2 * margin + 1)² windows around spots, NYX
+        positions = np.asarray(positions, dtype=np.int64)
+        offsets = np.arange(-margin, margin + 1)
+        rows = positions[:, 0, np.newaxis] + offsets
+        cols = positions[:, 1, np.newaxis] + offsets
+        height, width = image.shape
+        windows = image[
+            np.clip(rows, 0, height - 1)[:, :, np.newaxis],
+            np.clip(cols, 0, width - 1)[:, np.newaxis, :],
+        ]
+        # Ignore pixels outside the image, as cropping would do
+        inside = ((rows >= 0) & (rows < height))[:, :, np.newaxis] & (
+            (cols >= 0) & (cols < width)
+        )[:, np.newaxis, :]
+
+        sums = np.sum(windows, axis=(1, 2), where=inside, dtype=np.int64)
+        counts = np.sum(inside, axis=(1, 2))
+        return (sums / counts).astype(int).tolist()
+
     def _get_mid_body_expected_positions(
         self,
         mitosis_track: MitosisTrack,
@@ -427,6 +496,11 @@ class MidBodyDetectionFactory:
         # NB: only first daughter is considered
         daughter_track = daughter_tracks[0]
 
+        # Offset to get positions relative to mitosis track, (x, y)
+        position_offset = np.array(
+            [mitosis_track.position.min_x, mitosis_track.position.min_y]
+        )
+
         rel_expected_positions = {}
         for frame in range(
             daughter_track.start,
@@ -440,26 +514,21 @@ class MidBodyDetectionFactory:
                 continue
 
             # Get relative positions
-            rel_positions_mother = [
-                [
-                    int(mother_point[0]) - mitosis_track.position.min_x,
-                    int(mother_point[1]) - mitosis_track.position.min_y,
-                ]
-                for mother_point in mother_track.spots[frame].spot_points
-            ]
-            rel_positions_daughter = [
-                [
-                    int(daughter_point[0]) - mitosis_track.position.min_x,
-                    int(daughter_point[1]) - mitosis_track.position.min_y,
-                ]
-                for daughter_point in daughter_track.spots[frame].spot_points
-            ]
+            rel_positions_mother = (
+                np.array(mother_track.spots[frame].spot_points).astype(int)
+                - position_offset
+            ).tolist()
+            rel_positions_daughter = (
+                np.array(daughter_track.spots[frame].spot_points).astype(int)
+                - position_offset
+            ).tolist()
 
             # Try to get points in both cells
+            daughter_positions_set = set(map(tuple, rel_positions_daughter))
             mid_body_candidates = [
                 position
                 for position in rel_positions_mother
-                if position in rel_positions_daughter
+                if tuple(position) in daughter_positions_set
             ]
             if (
                 len(mid_body_candidates) > 0
@@ -536,30 +605,30 @@ class MidBodyDetectionFactory:
         # Iterate over all tracks and keep only those with high sir-tubulin signal
         kept_tracks: list[MidBodyTrack] = []
         for track in mid_body_tracks:
-            abs_track_frames = [
-                frame + mitosis_track.min_frame
-                for frame in list(track.spots.keys())
-            ]
-            # Ignore if no frame in common
+            track_frames, track_positions = track.get_spots_arrays()
+            # Track frames within [abs_min_frame, abs_max_frame), found by
+            # binary search as frames are sorted
+            start, stop = np.searchsorted(
+                track_frames,
+                (
+                    abs_min_frame - mitosis_track.min_frame,
+                    abs_max_frame - mitosis_track.min_frame,
+                ),
+            )
+            frame_count = stop - start
+            # Ignore if no frame in common, or if mid-body is not detected
+            # in enough frames
             if (
-                abs_min_frame > abs_track_frames[-1]
-                or abs_max_frame < abs_track_frames[0]
+                frame_count == 0
+                or frame_count < self.minimum_mid_body_track_length
             ):
                 continue
-            frame_count, total_sir_intensity = 0, 0
-            for abs_frame in range(abs_min_frame, abs_max_frame):
-                if abs_frame not in abs_track_frames:
-                    continue
-                frame_count += 1
-                track_spot = track.spots[abs_frame - mitosis_track.min_frame]
-                total_sir_intensity += tubulin_movie[
-                    abs_frame - mitosis_track.min_frame,
-                    track_spot.y,
-                    track_spot.x,
-                ]
-            # Ignore if mid-body is not detected in enough frames
-            if frame_count < self.minimum_mid_body_track_length:
-                continue
+            # Gather sir-tubulin intensities at spots positions at once
+            total_sir_intensity = tubulin_movie[
+                track_frames[start:stop],
+                track_positions[start:stop, 0],
+                track_positions[start:stop, 1],
+            ].sum()
             # Ignore if sir-tubulin signal is not high enough
             if total_sir_intensity / frame_count < threshold:
                 continue
@@ -583,9 +652,5 @@ class MidBodyDetectionFactory:
             )
         assert len(expected_distances) == len(kept_tracks)
 
-        # Sort tracks by expected distance
-        sorted_tracks = sorted(
-            kept_tracks,
-            key=lambda track: expected_distances[kept_tracks.index(track)],
-        )
-        return sorted_tracks[0]
+        # Keep track with lowest expected distance, first one if tie
+        return kept_tracks[int(np.argmin(expected_distances))]
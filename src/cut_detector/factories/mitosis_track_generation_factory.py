@@ -226,10 +226,15 @@ class MitosisTrackGenerationFactory:
         """
 
         nuclei_crops, numbers_crops = [], []
+        # Index spots once, to avoid scanning all spots for each track
+        raw_spots_by_id = {spot.id: spot for spot in raw_spots}
+
         # Get list of possible metaphase spots
         for track in cell_tracks:
             # Get current track spots data & images
-            current_nuclei_crops = track.get_spots_data(raw_spots, raw_video)
+            current_nuclei_crops = track.get_spots_data(
+                raw_spots_by_id, raw_video
+            )
             # Merge current_nuclei_crops with nuclei_crops
             nuclei_crops = nuclei_crops + current_nuclei_crops  # CYX
             numbers_crops.append(len(current_nuclei_crops))
@@ -40,23 +40,16 @@ def grayscale_to_rgb(grayscale_image, channel_axis, minimum_value=50):
     grayscale_image = grayscale_image.astype(np.uint8)  # TYX
 
     indexes = np.unique(grayscale_image)
-    fake_second_channel = np.copy(grayscale_image)
-    fake_third_channel = np.copy(grayscale_image)
 
+    # Look-up table from index to random color, background remains black
     random_colors = get_random_different_colors(len(indexes), nb_channels=2)
-    for random_color, index in zip(random_colors, indexes):
-        if index == 0:
-            continue
-        fake_second_channel[grayscale_image == index] = random_color[0]
-        fake_third_channel[grayscale_image == index] = random_color[1]
-
-    grayscale_image = np.stack(
-        [
-            grayscale_image,
-            fake_second_channel,
-            fake_third_channel,
-        ],
-        axis=-1,
+    colors_lut = np.zeros((256, 2), dtype=np.uint8)
+    colors_lut[indexes] = random_colors
+    colors_lut[0] = 0
+    fake_channels = colors_lut[grayscale_image]  # TYXC
+
+    grayscale_image = np.concatenate(
+        [grayscale_image[..., np.newaxis], fake_channels], axis=-1
     )  # TYXC
 
     # Match original image shape
@@ -536,15 +529,14 @@ class ResultsSavingFactory:
                 f.write(f"{second_cut_time};\n")
         f.close()
 
-    def generate_napari_tracking_mask(
+    def get_napari_tracking_layers(
         self,
         mitosis_tracks: list[MitosisTrack],
         video: np.ndarray,
-        viewer: Optional[Viewer] = None,
         segmentation_results: Optional[np.ndarray] = None,
         cell_tracks: Optional[list[CellTrack]] = None,
-    ) -> None:
-        """Generate napari tracking mask.
+    ) -> dict[str, np.ndarray]:
+        """Compute napari tracking layers, without displaying them.
 
         Parameters
         ----------
@@ -552,10 +544,17 @@ class ResultsSavingFactory:
             List of mitosis tracks.
         video: np.ndarray
             Video to process. Any dimension order.
-        viewer: napari.Viewer
-            Napari viewer.
         segmentation_results: np.ndarray
             Cellpose results. TYX.
+        cell_tracks: list[CellTrack]
+            List of cell tracks.
+
+        Returns
+        -------
+        dict[str, np.ndarray]
+            Cell divisions, mid-body points and categories, and if inputs
+            are provided, segmentation and tracking. Images have the same
+            shape as the video.
         """
 
         channel_axis = np.argmin(video.shape)
@@ -582,11 +581,8 @@ class ResultsSavingFactory:
             _, mask_movie = mitosis_track.generate_video_movie(
                 video_to_process
             )
-            cell_indexes = np.where(mask_movie == 1)
-            mask_movie = np.stack(
-                [mask_movie, mask_movie, mask_movie], axis=-1
-            )
-            mask_movie[cell_indexes] = colors[idx]
+            # Color cell pixels in a single broadcast pass, TYXC
+            mask_movie = (mask_movie == 1)[..., np.newaxis] * colors[idx]
             initial_mask = mitoses_results[
                 mitosis_track.min_frame : mitosis_track.max_frame + 1,
                 mitosis_track.position.min_y : mitosis_track.position.max_y,
@@ -606,13 +602,7 @@ class ResultsSavingFactory:
 
         # Use point + text instead of red point for mid_body
         points = []
-        features = {"category": []}
-        text = {
-            "string": "{category}",
-            "size": 10,
-            "color": "white",
-            "translation": np.array([-30, 0]),
-        }
+        categories = []
         for mitosis_track in mitosis_tracks:
             if not mitosis_track.display():
                 continue
@@ -623,41 +613,78 @@ class ResultsSavingFactory:
                 )
                 if rgb:
                     points += [single_layer_points]
-                    features["category"] += [frame_dict["category"]]
+                    categories += [frame_dict["category"]]
                 else:
                     for idx in range(3):  # 3 channels
                         layer_points = np.insert(
                             single_layer_points, channel_axis, idx
                         )
                         points += [layer_points]
-                        features["category"] += [frame_dict["category"]]
-        features["category"] = np.array(features["category"])
+                        categories += [frame_dict["category"]]
 
-        if viewer is None:
-            return
+        layers = {
+            "divisions": mitoses_results,
+            "mid_body_points": np.reshape(points, (-1, 3 if rgb else 4)),
+            "mid_body_categories": np.array(categories),
+        }
+
+        if segmentation_results is not None:
+            segmentation_results = grayscale_to_rgb(
+                segmentation_results, channel_axis
+            )
+            assert segmentation_results.shape == video.shape
+            layers["segmentation"] = segmentation_results
+
+        if cell_tracks is not None:
+            tracking_results = generate_tracking_movie(
+                cell_tracks, video_to_process
+            )  # TYX
+
+            tracking_results = grayscale_to_rgb(tracking_results, channel_axis)
+            assert tracking_results.shape == video.shape
+            layers["tracking"] = tracking_results
+
+        return layers
+
+    @staticmethod
+    def add_napari_tracking_layers(
+        viewer: Viewer, layers: dict[str, np.ndarray], rgb: bool
+    ) -> None:
+        """Add napari tracking layers to viewer.
+
+        Parameters
+        ----------
+        viewer: napari.Viewer
+            Napari viewer.
+        layers: dict[str, np.ndarray]
+            Layers, as computed by get_napari_tracking_layers.
+        rgb: bool
+            Whether images are RGB, i.e. with channels in last axis.
+        """
+        text = {
+            "string": "{category}",
+            "size": 10,
+            "color": "white",
+            "translation": np.array([-30, 0]),
+        }
 
         viewer.add_image(
-            mitoses_results,
+            layers["divisions"],
             name="Cell divisions",
             opacity=0.4,
             rgb=rgb,
             colormap=None if rgb else "inferno",
         )
         viewer.add_points(
-            points,
-            features=features,
+            layers["mid_body_points"],
+            features={"category": layers["mid_body_categories"]},
             text=text,
             name="Mid-bodies",
         )
 
-        if segmentation_results is not None:
-            segmentation_results = grayscale_to_rgb(
-                segmentation_results, channel_axis
-            )
-            assert segmentation_results.shape == video.shape
-
+        if "segmentation" in layers:
             viewer.add_image(
-                segmentation_results,
+                layers["segmentation"],
                 name="Segmentation",
                 opacity=0.4,
                 rgb=rgb,
@@ -665,19 +692,58 @@ class ResultsSavingFactory:
                 visible=False,
             )
 
-        if cell_tracks is not None:
-            mitoses_results = generate_tracking_movie(
-                cell_tracks, video_to_process
-            )  # TYX
-
-            mitoses_results = grayscale_to_rgb(mitoses_results, channel_axis)
-            assert mitoses_results.shape == video.shape
-
+        if "tracking" in layers:
             viewer.add_image(
-                mitoses_results,
+                layers["tracking"],
                 name="Tracking",
                 opacity=0.4,
                 rgb=rgb,
                 colormap=None if rgb else "inferno",
                 visible=False,
             )
+
+    def generate_napari_tracking_mask(
+        self,
+        mitosis_tracks: list[MitosisTrack],
+        video: np.ndarray,
+        viewer: Optional[Viewer] = None,
+        segmentation_results: Optional[np.ndarray] = None,
+        cell_tracks: Optional[list[CellTrack]] = None,
+    ) -> dict[str, np.ndarray]:
+        """Generate napari tracking mask.
+
+        Parameters
+        ----------
+        mitosis_tracks: list[MitosisTrack]
+            List of mitosis tracks.
+        video: np.ndarray
+            Video to process. Any dimension order.
+        viewer: napari.Viewer
+            Napari viewer.
+        segmentation_results: np.ndarray
+            Cellpose results. TYX.
+        cell_tracks: list[CellTrack]
+            List of cell tracks.
+
+        Returns
+        -------
+        dict[str, np.ndarray]
+            Computed layers, see get_napari_tracking_layers. Without viewer,
+            segmentation and tracking layers are not computed.
+        """
+        # Segmentation and tracking layers are only displayed, skip them
+        # when there is no viewer
+        layers = self.get_napari_tracking_layers(
+            mitosis_tracks,
+            video,
+            segmentation_results=(
+                segmentation_results if viewer is not None else None
+            ),
+            cell_tracks=cell_tracks if viewer is not None else None,
+        )
+
+        if viewer is not None:
+            rgb = np.argmin(video.shape) == 3
+            self.add_napari_tracking_layers(viewer, layers, rgb)
+
+        return layers
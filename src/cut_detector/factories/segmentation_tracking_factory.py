@@ -1,5 +1,10 @@
 import concurrent.futures
+from contextlib import nullcontext
+from functools import lru_cache
+import os
 import time
+import warnings
+from typing import ContextManager, Optional
 import numpy as np
 import torch
 from cellpose import models
@@ -16,6 +21,50 @@ from ..utils.mid_body_detection.spatial_laptrack import (
 from ..utils.track_generation import generate_tracks_from_spots
 
 
+@lru_cache(maxsize=1)
+def load_cellpose_model(
+    model_path: str, device: torch.device, compile_network=False
+) -> models.CellposeModel:
+    """Load cellpose model. Last loaded model is cached, so that weights
+    are not read again when segmenting several videos.
+
+    Parameters
+    ----------
+    model_path : str
+        Path to the cellpose model.
+    device : torch.device
+        Device to load the model on.
+    compile_network : bool
+        Whether to compile the network with torch.compile, if available.
+
+    Returns
+    -------
+    models.CellposeModel
+        Cellpose model.
+    """
+    model = models.CellposeModel(pretrained_model=model_path, device=device)
+    # "reduce-overhead" relies on CUDA graphs, so only compile on GPU
+    if compile_network and device.type == "cuda" and hasattr(torch, "compile"):
+        model.net = torch.compile(model.net, mode="reduce-overhead")
+    return model
+
+
+def get_compilation_errors() -> tuple[type[Exception], ...]:
+    """Get errors raised by torch.compile when a compiled network fails.
+    Compilation is lazy, so they are raised at first forward pass.
+
+    Returns
+    -------
+    tuple[type[Exception], ...]
+        Compilation errors, empty if torch.compile is not available.
+    """
+    try:
+        from torch._dynamo.exc import TorchDynamoException
+    except ImportError:
+        return ()
+    return (TorchDynamoException,)
+
+
 class SegmentationTrackingFactory:
     """Class to perform cell segmentation and tracking.
 
@@ -35,6 +84,9 @@ class SegmentationTrackingFactory:
         Ratio of average spot size
     max_frame_gap : int
         Maximum number of frames to consider for gap closing
+    fast_inference : bool
+        Compile cellpose network and run it in half precision on GPU.
+        Faster, but segmentation may slightly differ.
     """
 
     def __init__(
@@ -47,6 +99,7 @@ class SegmentationTrackingFactory:
         linking_max_distance_ratio=1,
         max_frame_gap=CellTrack.max_frame_gap,
         minimum_cell_track_length=10,
+        fast_inference=False,
     ) -> None:
         self.model_path = model_path
         self.augment = augment
@@ -56,6 +109,76 @@ class SegmentationTrackingFactory:
         self.linking_max_distance_ratio = linking_max_distance_ratio
         self.max_frame_gap = max_frame_gap
         self.minimum_cell_track_length = minimum_cell_track_length
+        self.fast_inference = fast_inference
+
+    def get_inference_context(
+        self, device: torch.device
+    ) -> ContextManager[None]:
+        """Get context to run cellpose in, with half precision autocast
+        on GPU if fast inference is enabled.
+
+        Parameters
+        ----------
+        device : torch.device
+            Device the model runs on.
+
+        Returns
+        -------
+        ContextManager[None]
+            Inference context.
+        """
+        if self.fast_inference and device.type == "cuda":
+            # float16 rather than bfloat16, as outputs are converted to numpy
+            return torch.autocast(device_type="cuda", dtype=torch.float16)
+        return nullcontext()
+
+    def run_cellpose(
+        self,
+        model: models.CellposeModel,
+        video: np.ndarray,
+        device: torch.device,
+    ) -> tuple[np.ndarray, list[np.ndarray]]:
+        """Run cellpose on video. If compiled network fails, it is replaced
+        by the original network and cellpose is run again.
+
+        Parameters
+        ----------
+        model : models.CellposeModel
+            Cellpose model.
+        video : np.ndarray
+            TCYX
+        device : torch.device
+            Device the model runs on.
+
+        Returns
+        -------
+        np.ndarray
+            Cellpose results. TYX.
+        list[np.ndarray]
+            Cellpose flows.
+        """
+        try:
+            with self.get_inference_context(device):
+                cellpose_results, flows, _ = model.eval(  # TYX
+                    video,
+                    channels=[3, 0],
+                    diameter=0,
+                    flow_threshold=self.flow_threshold,
+                    cellprob_threshold=self.cellprob_threshold,
+                    augment=self.augment,
+                    resample=False,
+                )
+        except get_compilation_errors() as error:
+            if not hasattr(model.net, "_orig_mod"):
+                raise
+            warnings.warn(
+                "Compiled cellpose network failed, running it uncompiled: "
+                f"{error}",
+                stacklevel=2,
+            )
+            model.net = model.net._orig_mod
+            return self.run_cellpose(model, video, device)
+        return cellpose_results, flows
 
     @staticmethod
     def get_spots_from_cellpose(
@@ -69,7 +192,7 @@ class SegmentationTrackingFactory:
         cellpose_results : np.ndarray
             TYX
         parallel : bool
-            Whether to use parallel processing.
+            Whether to process frames in parallel, one process per core.
 
         Returns
         -------
@@ -78,26 +201,49 @@ class SegmentationTrackingFactory:
         """
         print("Extracting spots from segmentation results.")
         if parallel:
-            future_list = []
-            with concurrent.futures.ThreadPoolExecutor() as e:
-                for frame, cellpose_result in enumerate(cellpose_results):
-                    future_list.append(
-                        e.submit(get_spots_from_frame, frame, cellpose_result)
+            # Contour extraction is mostly Python code holding the GIL,
+            # so frames are processed in separate processes
+            nb_frames = len(cellpose_results)
+            chunk_size = max(1, nb_frames // (4 * (os.cpu_count() or 1)))
+            with concurrent.futures.ProcessPoolExecutor() as e:
+                cell_dictionary = dict(
+                    e.map(
+                        get_spots_from_frame,
+                        range(nb_frames),
+                        cellpose_results,
+                        chunksize=chunk_size,
                     )
-
-            cell_dictionary = {
-                res.result()[0]: res.result()[1]
-                for res in concurrent.futures.as_completed(future_list)
-            }
+                )
         else:
             cell_dictionary = {}
             for frame, cellpose_result in enumerate(tqdm(cellpose_results)):
                 _, spots = get_spots_from_frame(frame, cellpose_result)
                 cell_dictionary[frame] = spots
 
-        # Give id number to cell spots
+        return SegmentationTrackingFactory._number_cell_spots(
+            cell_dictionary, len(cellpose_results)
+        )
+
+    @staticmethod
+    def _number_cell_spots(
+        cell_dictionary: dict[int, list[CellSpot]], nb_frames: int
+    ) -> dict[int, list[CellSpot]]:
+        """Give id number to cell spots, in frame order.
+
+        Parameters
+        ----------
+        cell_dictionary : dict[int, list[CellSpot]]
+            Dictionary with frame number as key and list of cell spots as value.
+        nb_frames : int
+            Number of frames.
+
+        Returns
+        -------
+        dict[int, list[CellSpot]]
+            Same dictionary, sorted by frame.
+        """
         id_number = 0
-        for frame in range(len(cellpose_results)):
+        for frame in range(nb_frames):
             if frame not in cell_dictionary:
                 continue
             for cell in cell_dictionary[frame]:
@@ -132,28 +278,85 @@ class SegmentationTrackingFactory:
 
         # Cellpose segmentation
         device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        model = models.CellposeModel(
-            pretrained_model=self.model_path, device=device
+        model = load_cellpose_model(
+            self.model_path, device, self.fast_inference
         )
 
         print("Running Cellpose.")
         start = time.time()
-        cellpose_results, flows, _ = model.eval(  # TYX
-            video,
-            channels=[3, 0],
-            diameter=0,
-            flow_threshold=self.flow_threshold,
-            cellprob_threshold=self.cellprob_threshold,
-            augment=self.augment,
-            resample=False,
-        )
+        cellpose_results, flows = self.run_cellpose(model, video, device)
         time_second = int(time.time() - start)
         print(f"Done in {time_second} seconds.")
 
         return cellpose_results, flows, model.diam_labels
 
+    def perform_pipelined_segmentation(
+        self,
+        video: np.ndarray,
+        frames_per_chunk: int = 8,
+    ) -> tuple[np.ndarray, dict[int, list[CellSpot]], float]:
+        """Perform cell segmentation using cellpose, chunk by chunk, while
+        spots of previous chunks are extracted in background processes.
+        GPU inference and CPU contour extraction thus overlap.
+
+        Parameters
+        ----------
+        video : np.ndarray
+            TCYX
+        frames_per_chunk : int
+            Number of frames segmented at once.
+
+        Returns
+        -------
+        np.ndarray
+            Cellpose results. TYX.
+        dict[int, list[CellSpot]]
+            Dictionary with frame number as key and list of cell spots as value.
+        float
+            Expected diameter of the cells.
+        """
+        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        model = load_cellpose_model(
+            self.model_path, device, self.fast_inference
+        )
+
+        print("Running Cellpose and extracting spots.")
+        start = time.time()
+        cellpose_chunks: list[np.ndarray] = []
+        spots_futures: list[concurrent.futures.Future] = []
+        with concurrent.futures.ProcessPoolExecutor() as e:
+            for first_frame in tqdm(range(0, len(video), frames_per_chunk)):
+                cellpose_chunk, _ = self.run_cellpose(
+                    model,
+                    video[first_frame : first_frame + frames_per_chunk],
+                    device,
+                )
+                # Cellpose squeezes results, restore T axis of 1-frame chunks
+                cellpose_chunk = cellpose_chunk.reshape(
+                    (-1, *cellpose_chunk.shape[-2:])
+                )  # TYX
+                cellpose_chunks.append(cellpose_chunk)
+                # Extract spots in background while next chunk is segmented
+                spots_futures.extend(
+                    e.submit(get_spots_from_frame, first_frame + idx, result)
+                    for idx, result in enumerate(cellpose_chunk)
+                )
+            cell_dictionary = dict(future.result() for future in spots_futures)
+        time_second = int(time.time() - start)
+        print(f"Done in {time_second} seconds.")
+
+        cellpose_results = np.concatenate(cellpose_chunks)  # TYX
+        cell_dictionary = self._number_cell_spots(
+            cell_dictionary, len(cellpose_results)
+        )
+
+        return cellpose_results, cell_dictionary, model.diam_labels
+
     def perform_tracking(
-        self, cellpose_results: np.ndarray, diam_labels: float
+        self,
+        cellpose_results: np.ndarray,
+        diam_labels: float,
+        cell_spots_dictionary: Optional[dict[int, list[CellSpot]]] = None,
     ) -> tuple[list[CellSpot], list[CellTrack]]:
         """Perform tracking using laptrack.
 
@@ -163,6 +366,8 @@ class SegmentationTrackingFactory:
             TYX
         diam_labels : float
             Expected diameter of the cells.
+        cell_spots_dictionary : Optional[dict[int, list[CellSpot]]]
+            Spots already extracted from cellpose results, if any.
 
         Returns
         -------
@@ -171,7 +376,10 @@ class SegmentationTrackingFactory:
         list[CellTrack]
             List of cell tracks.
         """
-        cell_spots_dictionary = self.get_spots_from_cellpose(cellpose_results)
+        if cell_spots_dictionary is None:
+            cell_spots_dictionary = self.get_spots_from_cellpose(
+                cellpose_results
+            )
 
         tracking_method = SpatialLapTrack(
             spatial_coord_slice=slice(0, 2),
@@ -206,6 +414,7 @@ class SegmentationTrackingFactory:
     def perform_segmentation_tracking(
         self,
         video: np.ndarray,
+        pipeline: bool = False,
     ) -> tuple[list[CellSpot], list[CellTrack], np.ndarray]:
         """Perform cell segmentation and tracking.
 
@@ -213,6 +422,8 @@ class SegmentationTrackingFactory:
         ----------
         video : np.ndarray
             TCYX
+        pipeline : bool
+            Whether to extract spots while segmentation is running.
 
         Returns
         -------
@@ -224,9 +435,17 @@ class SegmentationTrackingFactory:
             Segmentation results. TYX.
         """
 
-        segmentation_results, _, diam_labels = self.perform_segmentation(video)
+        if pipeline:
+            segmentation_results, cell_spots_dictionary, diam_labels = (
+                self.perform_pipelined_segmentation(video)
+            )
+        else:
+            segmentation_results, _, diam_labels = self.perform_segmentation(
+                video
+            )
+            cell_spots_dictionary = None
         cell_spots, cell_tracks = self.perform_tracking(
-            segmentation_results, diam_labels
+            segmentation_results, diam_labels, cell_spots_dictionary
         )
 
         return cell_spots, cell_tracks, segmentation_results
@@ -35,7 +35,7 @@ class BoxDimensionsContour(BoxDimensions):
             binary_image = Image.new("1", (local_shape[1], local_shape[0]), 0)
             draw = ImageDraw.Draw(binary_image)
             draw.polygon(
-                [(point[1], point[0]) for point in points],
+                np.reshape(points, (-1, 2))[:, ::-1].ravel().tolist(),
                 outline=1,
                 fill=1,
             )
@@ -51,20 +51,11 @@ class BoxDimensionsContour(BoxDimensions):
         relative : bool
             Relative or absolute coordinates.
         """
-        # Switch dimensions
-        if relative:
-            self.list_points = [
-                [
-                    [
-                        y - self.min_y,
-                        x - self.min_x,
-                    ]
-                    for x, y in track_frame_points
-                ]
-                for track_frame_points in self.list_points
-            ]
-        else:
-            self.list_points = [
-                [[y, x] for x, y in track_frame_points]
-                for track_frame_points in self.list_points
-            ]
+        # Switch dimensions, all points of a frame at once
+        offset = [self.min_y, self.min_x] if relative else [0, 0]
+        self.list_points = [
+            (
+                np.reshape(track_frame_points, (-1, 2))[:, ::-1] - offset
+            ).tolist()
+            for track_frame_points in self.list_points
+        ]
@@ -100,6 +100,11 @@ class CellSpot(Spot):
     def load(file: BufferedReader) -> CellSpot:
         """Load a MitosisTrack from a file, and adapt attributes if necessary."""
         cell_spot: CellSpot = pickle.load(file)
+        return CellSpot.adapt_deprecated_attributes(cell_spot)
+
+    @staticmethod
+    def adapt_deprecated_attributes(cell_spot: CellSpot) -> CellSpot:
+        """Adapt attributes of a CellSpot saved by an older version."""
         if not hasattr(cell_spot, "corresponding_metaphase_sequence"):
             if cell_spot.corresponding_metaphase_spot is not None:
                 cell_spot.corresponding_metaphase_sequence = MetaphaseSequence(
@@ -324,15 +324,15 @@ class CellTrack(Track[CellSpot]):
         return box_dimensions_advanced
 
     def get_spots_data(
-        self, raw_spots: list[CellSpot], raw_video: np.ndarray
+        self, raw_spots: dict[int, CellSpot], raw_video: np.ndarray
     ) -> list[np.array]:
         """
         Generate crops around cells for metaphase CNN inference.
 
         Parameters
         ----------
-        raw_spots : list[CellSpot]
-            All video spots.
+        raw_spots : dict[int, CellSpot]
+            All video spots, indexed by id.
         raw_video : np.ndarray
             TYXC
 
@@ -345,13 +345,12 @@ class CellTrack(Track[CellSpot]):
         spot_abs_positions = {}  # {frame: BoxDimensions}
         cell_crops = []  # CYX
 
-        for spot in raw_spots:
+        # Only look up spots of current track, in id order (i.e. frame order)
+        for spot_id in sorted(self.track_spots_ids):
+            spot = raw_spots[spot_id]
             # Ignore spots before or after current track
             if spot.frame < self.start or spot.frame > self.stop:
                 continue
-            # Ignore spots not in current track
-            if spot.id not in self.track_spots_ids:
-                continue
             # Store positions
             spot_abs_positions[spot.frame] = BoxDimensions(
                 spot.abs_min_x,
@@ -388,15 +387,14 @@ class CellTrack(Track[CellSpot]):
         track_df.dropna(inplace=True)
         id_to_track = {}
 
-        for _, row in track_df.iterrows():
-            track_id = row["track_id"]
+        for track_id, frame, idx_in_frame in track_df[
+            ["track_id", "frame", "idx_in_frame"]
+        ].to_numpy(dtype=np.int64):
             track: list = id_to_track.get(track_id)
             if track is None:
                 id_to_track[track_id] = []
                 track = id_to_track[track_id]
-            frame = row["frame"]
-            idx_in_frame = row["idx_in_frame"]
-            track.append(spots[int(frame)][int(idx_in_frame)])
+            track.append(spots[frame][idx_in_frame])
         return [
             CellTrack.from_spots(track_id, spots)
             for track_id, spots in enumerate(id_to_track.values())
@@ -406,6 +404,11 @@ class CellTrack(Track[CellSpot]):
     def load(file: BufferedReader) -> CellTrack:
         """Load a CellTrack from a file, and adapt attributes if necessary."""
         cell_track: CellTrack = CustomUnPickle(file).load()
+        return CellTrack.adapt_deprecated_attributes(cell_track)
+
+    @staticmethod
+    def adapt_deprecated_attributes(cell_track: CellTrack) -> CellTrack:
+        """Adapt attributes of a CellTrack saved by an older version."""
         if not hasattr(cell_track, "metaphase_sequences"):
             cell_track.metaphase_sequences = []
         if not hasattr(cell_track, "spots"):
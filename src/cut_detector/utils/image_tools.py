@@ -322,3 +322,35 @@ def cell_counter_frame_to_video_frame(
     frames 5, 6, 7 and 8 will be frame 2, etc.
     """
     return (cell_counter_frame - 1) // nb_channels
+
+
+def quantize_to_uint8(
+    image: np.ndarray,
+    channel_axis: int,
+    percentiles: tuple[float, float] = (1, 99),
+) -> np.ndarray:
+    """Quantize image to uint8, normalizing each channel independently
+    between its low and high percentiles. Meant for visualization only.
+
+    Parameters
+    ----------
+    image : np.ndarray
+        Image to quantize.
+    channel_axis : int
+        Channel axis.
+    percentiles : tuple[float, float]
+        Percentiles mapped to 0 and 255, by default (1, 99).
+
+    Returns
+    -------
+    np.ndarray
+        Quantized image, same shape.
+    """
+    other_axes = tuple(
+        axis for axis in range(image.ndim) if axis != channel_axis % image.ndim
+    )
+    low, high = np.percentile(
+        image, percentiles, axis=other_axes, keepdims=True
+    )
+    normalized = (image - low) * (255 / np.maximum(high - low, 1e-6))
+    return np.clip(normalized, 0, 255).astype(np.uint8)
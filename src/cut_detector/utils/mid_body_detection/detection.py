@@ -2,7 +2,9 @@
 
 from functools import partial
 import numpy as np
+from scipy import ndimage
 from skimage.feature import blob_log, blob_dog, blob_doh
+from skimage.morphology import extrema
 
 
 def min_max(img: np.ndarray) -> np.ndarray:
@@ -77,7 +79,114 @@ def detect_minmax_doh(img: np.ndarray, **kwargs) -> np.ndarray:
     return blob_doh(img_norm, **kwargs)
 
 
+def detect_minmax_gpu(img: np.ndarray, method: str, **kwargs) -> np.ndarray:
+    """Detect blobs on GPU with cuCIM, with min-max normalization.
+    Image is uploaded once, normalized and filtered on device, and only
+    detected blobs are copied back to host.
+
+    Parameters
+    ----------
+    img : np.ndarray
+        Image to detect blobs.
+    method : str
+        Name of the cuCIM blob function: "blob_log", "blob_dog" or
+        "blob_doh".
+    **kwargs
+        Extra arguments for the cuCIM blob function.
+
+    Returns
+    -------
+    np.ndarray
+        Blobs detected."""
+    try:
+        import cupy as cp  # type: ignore (removes the import warning)
+        from cucim.skimage import feature  # type: ignore
+    except ImportError as err:
+        raise ImportError(
+            "Please install `cupy` and `cucim` to use GPU detection."
+        ) from err
+    img_gpu = cp.asarray(img, dtype=cp.float32)
+    img_min, img_max = img_gpu.min(), img_gpu.max()
+    img_gpu = (img_gpu - img_min) / (img_max - img_min)
+    blobs = getattr(feature, method)(img_gpu, **kwargs)
+    return cp.asnumpy(blobs)
+
+
+def opening_3x3(image: np.ndarray) -> np.ndarray:
+    """Grayscale opening with a flat 3x3 footprint.
+    Footprint is separable, so erosion and dilation are done with 1D
+    min/max filters along each axis. Same result as skimage opening.
+
+    Parameters
+    ----------
+    image : np.ndarray
+        Image to process. YX.
+
+    Returns
+    -------
+    np.ndarray
+        Opened image. YX.
+    """
+    eroded = ndimage.minimum_filter1d(
+        ndimage.minimum_filter1d(image, 3, axis=0), 3, axis=1
+    )
+    return ndimage.maximum_filter1d(
+        ndimage.maximum_filter1d(eroded, 3, axis=0), 3, axis=1
+    )
+
+
+def detect_h_maxima(img: np.ndarray, h_maxima_threshold=5.0) -> np.ndarray:
+    """Detect spots as h-maxima brighter than the 99th percentile of image.
+    NB: old method, to be removed.
+
+    Parameters
+    ----------
+    img : np.ndarray
+        Image to detect spots.
+    h_maxima_threshold : float
+        Minimal height of maxima.
+
+    Returns
+    -------
+    np.ndarray
+        Spots detected, (y, x)."""
+    # Perform opening to remove small spots
+    filtered_image = opening_3x3(img)
+    # Get local maxima using h_maxima
+    local_maxima = extrema.h_maxima(filtered_image, h_maxima_threshold)
+    # Label spot regions
+    labeled_local_maxima, nb_labels = ndimage.label(
+        local_maxima, structure=np.ones((3, 3))
+    )
+    # Remove inconsistent labels
+    # Threshold is computed as 99th percentile of image
+    filtering_threshold = np.quantile(img.flatten(), 0.99)
+    # Labels intensity in original image has to be higher than threshold
+    labels_intensity = ndimage.mean(
+        img,
+        labels=labeled_local_maxima,
+        index=np.arange(1, nb_labels + 1),
+    )
+    # Look-up table of labels to keep, background excluded
+    kept_labels = np.concatenate(
+        ([False], labels_intensity >= filtering_threshold)
+    )
+    # Re-label accordingly: kept components are unchanged and keep
+    # their raster order, so they only need consecutive numbers
+    new_labels = np.cumsum(kept_labels) * kept_labels
+    labeled_local_maxima = new_labels[labeled_local_maxima]
+    nb_labels = int(np.count_nonzero(kept_labels))
+    # Get center of mass to locate spots
+    spots = ndimage.center_of_mass(
+        local_maxima, labeled_local_maxima, range(1, nb_labels + 1)
+    )
+    # Here, do something to retrieve mid_body area and/or circularity...
+    return np.asarray(spots, dtype=np.int64).reshape((-1, img.ndim))
+
+
 DETECTION_FUNCTIONS = {
+    # h-maxima
+    "h_maxima": detect_h_maxima,
     # Laplacian of Gaussian
     "laplacian_gaussian": partial(
         detect_minmax_log,
@@ -126,4 +235,29 @@ DETECTION_FUNCTIONS = {
         num_sigma=5,
         threshold=0.0040,
     ),
+    # GPU versions, require cupy and cucim
+    "laplacian_gaussian_gpu": partial(
+        detect_minmax_gpu,
+        method="blob_log",
+        min_sigma=5,
+        max_sigma=10,
+        num_sigma=5,
+        threshold=0.1,
+    ),
+    "difference_gaussian_gpu": partial(
+        detect_minmax_gpu,
+        method="blob_dog",
+        min_sigma=2,
+        max_sigma=5,
+        sigma_ratio=1.2,
+        threshold=0.1,
+    ),
+    "determinant_hessian_gpu": partial(
+        detect_minmax_gpu,
+        method="blob_doh",
+        min_sigma=5,
+        max_sigma=10,
+        num_sigma=5,
+        threshold=0.0040,
+    ),
 }
@@ -1,10 +1,11 @@
 """ A modified version of LapTrack.
 - Maximum distance is only applied to the euclidian distance
+- Distance matrices can be computed by vectorized metrics
 """
 
 import numpy as np
 from functools import partial
-from typing import Callable, List, cast, Union
+from typing import Callable, List, Optional, cast, Union
 from pydantic import Field
 from scipy.spatial.distance import cdist
 from laptrack import LapTrack, ParallelBackend
@@ -38,9 +39,56 @@ class SpatialLapTrack(LapTrack):
         description="The metric to use to compute spatial distances",
     )
 
+    track_dist_matrix_metric: Optional[Callable] = Field(
+        None,
+        description=(
+            "Vectorized version of track_dist_metric, "
+            "computing the distance matrix between two sets of coords at once"
+        ),
+    )
+
+    gap_closing_dist_matrix_metric: Optional[Callable] = Field(
+        None,
+        description=(
+            "Vectorized version of gap_closing_dist_metric, "
+            "computing the distance matrix between two sets of coords at once"
+        ),
+    )
+
     class Config:
         arbitrary_types_allowed = True
 
+    @staticmethod
+    def _compute_dist_matrix(
+        coords1: np.ndarray,
+        coords2: np.ndarray,
+        metric: Union[str, Callable],
+        matrix_metric: Optional[Callable],
+    ) -> np.ndarray:
+        """
+        Compute distance matrix, with vectorized metric if available.
+        Otherwise, cdist calls metric for every pair of points.
+
+        Parameters
+        ----------
+            coords1 : np.ndarray
+                the first coordinates
+            coords2 : np.ndarray
+                the second coordinates
+            metric : Union[str, Callable]
+                the metric used by cdist
+            matrix_metric : Optional[Callable]
+                the vectorized metric
+
+        Returns
+        -------
+            np.ndarray: The distance matrix.
+
+        """
+        if matrix_metric is not None:
+            return matrix_metric(coords1, coords2)
+        return cdist(coords1, coords2, metric=metric)
+
     def _predict_links(
         self, coords, segment_connected_edges, split_merge_edges
     ) -> nx.Graph:
@@ -82,7 +130,12 @@ class SpatialLapTrack(LapTrack):
                 e[1][1] for e in edges_list if e[1][0] == frame + 1
             ]
 
-            dist_matrix = cdist(coord1, coord2, metric=self.track_dist_metric)
+            dist_matrix = self._compute_dist_matrix(
+                coord1,
+                coord2,
+                self.track_dist_metric,
+                self.track_dist_matrix_metric,
+            )
             dist_matrix[force_end_indices, :] = np.inf
             dist_matrix[:, force_start_indices] = np.inf
 
@@ -208,10 +261,11 @@ class SpatialLapTrack(LapTrack):
                 # https://stackoverflow.com/questions/35459306/find-points-within-cutoff-distance-of-other-points-with-scipy # noqa
                 # TrackMate also uses this (trivial) implementation.
                 if len(df) > 0:
-                    target_dist_matrix = cdist(
-                        [target_coord],
+                    target_dist_matrix = self._compute_dist_matrix(
+                        np.stack([target_coord]),
                         np.stack(df["first_frame_coords"].values),
-                        metric=self.gap_closing_dist_metric,
+                        self.gap_closing_dist_metric,
+                        self.gap_closing_dist_matrix_metric,
                     )
                     assert target_dist_matrix.shape[0] == 1
 
@@ -3,12 +3,43 @@
 from functools import partial
 from typing import Union
 from laptrack import LapTrack
+from numba import njit
 import numpy as np
-from scipy.spatial import distance
 
 from .spatial_laptrack import SpatialLapTrack
 
 
+@njit(cache=True, error_model="numpy")
+def _spatial_intensity_dist(
+    x1: float,
+    y1: float,
+    mlkp1: float,
+    sir1: float,
+    x2: float,
+    y2: float,
+    mlkp2: float,
+    sir2: float,
+    max_distance: float,
+    mklp_weight_factor: float,
+    sir_weight_factor: float,
+) -> float:
+    """Compiled scalar kernel of spatial_intensity_dist."""
+    # In case we have a None None point:
+    if np.isnan(x1) or np.isnan(y1) or np.isnan(x2) or np.isnan(y2):
+        return max_distance * 2  # connection is invalidated
+
+    # spatial coordinates: euclidean
+    dx, dy = x1 - x2, y1 - y2
+    spatial_e = np.sqrt(dx * dx + dy * dy)
+
+    mklp_penalty = (
+        3 * mklp_weight_factor * np.abs(mlkp1 - mlkp2) / (mlkp1 + mlkp2)
+    )
+    sir_penalty = 3 * sir_weight_factor * np.abs(sir1 - sir2) / (sir1 + sir2)
+    penalty = 1 + mklp_penalty + sir_penalty
+    return (spatial_e * penalty) ** 2
+
+
 def spatial_intensity_dist(
     c1: tuple,
     c2: tuple,
@@ -43,19 +74,72 @@ def spatial_intensity_dist(
     # unwrapping
     (x1, y1, mlkp1, sir1), (x2, y2, mlkp2, sir2) = c1, c2
 
-    # In case we have a None None point:
-    if np.isnan([x1, y1, x2, y2]).any():
-        return max_distance * 2  # connection is invalidated
+    return _spatial_intensity_dist(
+        float(x1),
+        float(y1),
+        float(mlkp1),
+        float(sir1),
+        float(x2),
+        float(y2),
+        float(mlkp2),
+        float(sir2),
+        float(max_distance),
+        float(mklp_weight_factor),
+        float(sir_weight_factor),
+    )
+
+
+def spatial_intensity_dist_matrix(
+    coords1: np.ndarray,
+    coords2: np.ndarray,
+    max_distance: Union[int, float],
+    mklp_weight_factor: float,
+    sir_weight_factor: float,
+) -> np.ndarray:
+    """Vectorized version of spatial_intensity_dist, computing distances
+    between all pairs of points at once.
+
+    Parameters
+    ----------
+    coords1 : np.ndarray
+        First points, (N, 4): spatial coordinates and intensities.
+    coords2 : np.ndarray
+        Second points, (M, 4): spatial coordinates and intensities.
+    max_distance : Union[int, float]
+        Maximum distance for connection.
+    mklp_weight_factor : float
+        Weight factor for MLKP intensity.
+    sir_weight_factor : float
+        Weight factor for SIR intensity.
+
+    Returns
+    -------
+    np.ndarray
+        Distance matrix, (N, M).
+    """
+    coords1 = np.asarray(coords1, dtype=np.float64)[:, np.newaxis, :]
+    coords2 = np.asarray(coords2, dtype=np.float64)[np.newaxis, :, :]
+    x1, y1, mlkp1, sir1 = np.moveaxis(coords1, -1, 0)
+    x2, y2, mlkp2, sir2 = np.moveaxis(coords2, -1, 0)
 
     # spatial coordinates: euclidean
-    spatial_e = distance.euclidean([x1, y1], [x2, y2])
+    dx, dy = x1 - x2, y1 - y2
+    spatial_e = np.sqrt(dx * dx + dy * dy)
 
-    mklp_penalty = (
-        3 * mklp_weight_factor * np.abs(mlkp1 - mlkp2) / (mlkp1 + mlkp2)
-    )
-    sir_penalty = 3 * sir_weight_factor * np.abs(sir1 - sir2) / (sir1 + sir2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mklp_penalty = (
+            3 * mklp_weight_factor * np.abs(mlkp1 - mlkp2) / (mlkp1 + mlkp2)
+        )
+        sir_penalty = (
+            3 * sir_weight_factor * np.abs(sir1 - sir2) / (sir1 + sir2)
+        )
     penalty = 1 + mklp_penalty + sir_penalty
-    return (spatial_e * penalty) ** 2
+    dist_matrix = (spatial_e * penalty) ** 2
+
+    # In case we have a None None point, connection is invalidated
+    invalid = np.isnan(x1) | np.isnan(y1) | np.isnan(x2) | np.isnan(y2)
+    dist_matrix[invalid] = max_distance * 2
+    return dist_matrix
 
 
 def get_tracking_method(
@@ -87,13 +171,21 @@ def get_tracking_method(
             mklp_weight_factor=5.0,
             sir_weight_factor=1.50,
         )
+        custom_spatial_distance_matrix = partial(
+            spatial_intensity_dist_matrix,
+            max_distance=max_distance_px,
+            mklp_weight_factor=5.0,
+            sir_weight_factor=1.50,
+        )
 
         return SpatialLapTrack(
             spatial_coord_slice=slice(0, 2),
             spatial_metric="euclidean",
             track_dist_metric=custom_spatial_distance,
+            track_dist_matrix_metric=custom_spatial_distance_matrix,
             track_cost_cutoff=max_distance_px,
             gap_closing_dist_metric=custom_spatial_distance,
+            gap_closing_dist_matrix_metric=custom_spatial_distance_matrix,
             gap_closing_cost_cutoff=max_distance_px,
             gap_closing_max_frame_count=3,
             splitting_cost_cutoff=False,
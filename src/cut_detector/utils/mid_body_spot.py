@@ -26,6 +26,16 @@ class MidBodySpot(Spot):
         Circularity of the spot, by default None.
     """
 
+    __slots__ = (
+        "intensity",
+        "sir_intensity",
+        "area",
+        "circularity",
+        "parent_spot",
+        "child_spot",
+        "track_id",
+    )
+
     def __init__(
         self,
         frame: int,
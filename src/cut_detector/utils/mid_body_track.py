@@ -12,6 +12,37 @@ class MidBodyTrack(Track[MidBodySpot]):
     Mid-body candidate track
     """
 
+    def add_spot(self, spot: MidBodySpot) -> None:
+        """
+        Add spot to track, and invalidate cached spots arrays.
+        """
+        super().add_spot(spot)
+        self._spots_arrays = None
+
+    def get_spots_arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        """Get frames and positions of spots as arrays, for vectorized
+        computations. Computed once, then cached until a spot is added.
+
+        Returns
+        -------
+        np.ndarray
+            Frames of spots, sorted. N.
+        np.ndarray
+            Positions of spots, (y, x). Nx2.
+        """
+        if getattr(self, "_spots_arrays", None) is None:
+            frames = np.fromiter(
+                self.spots.keys(), dtype=np.int64, count=len(self.spots)
+            )
+            positions = np.array(
+                [[spot.y, spot.x] for spot in self.spots.values()],
+                dtype=np.int64,
+            ).reshape((-1, 2))
+            # Spots may not have been added in frame order, e.g. by fill_gaps
+            order = np.argsort(frames, kind="stable")
+            self._spots_arrays = (frames[order], positions[order])
+        return self._spots_arrays
+
     @staticmethod
     def track_df_to_track_list(
         track_df: pd.DataFrame,
@@ -22,15 +53,14 @@ class MidBodyTrack(Track[MidBodySpot]):
         track_df.dropna(inplace=True)
         id_to_track = {}
 
-        for _, row in track_df.iterrows():
-            track_id = row["track_id"]
+        for track_id, frame, idx_in_frame in track_df[
+            ["track_id", "frame", "idx_in_frame"]
+        ].to_numpy(dtype=np.int64):
             track: MidBodyTrack = id_to_track.get(track_id)
             if track is None:
                 id_to_track[track_id] = MidBodyTrack(len(id_to_track))
                 track = id_to_track[track_id]
-            frame = row["frame"]
-            idx_in_frame = row["idx_in_frame"]
-            track.add_spot(spots[int(frame)][int(idx_in_frame)])
+            track.add_spot(spots[frame][idx_in_frame])
 
         return list(id_to_track.values())
 
@@ -55,17 +85,22 @@ class MidBodyTrack(Track[MidBodySpot]):
         """
         max_distance_px = int(max_distance / spatial_resolution * 1000)  # px
 
-        distances = []
-        for frame, position in expected_positions.items():
-            if frame not in self.spots:
-                continue
-            spot = self.spots[frame]
-            distances.append(
-                np.linalg.norm(spot.get_position() - np.array(position))
-            )
+        common_frames = [
+            frame for frame in expected_positions if frame in self.spots
+        ]
         # If there are no frames in common, for sure track is not the right one
-        if len(distances) == 0:
+        if len(common_frames) == 0:
             return np.inf
+        # Compute all distances at once
+        track_positions = np.array(
+            [self.spots[frame].get_position() for frame in common_frames]
+        )
+        common_expected_positions = np.array(
+            [expected_positions[frame] for frame in common_frames]
+        )
+        distances = np.linalg.norm(
+            track_positions - common_expected_positions, axis=1
+        )
         mean_distance = np.mean(distances)
         # If the mean distance is too high, discard the track
         if mean_distance > max_distance_px:
@@ -375,12 +375,9 @@ class MitosisTrack:
                 current_frame_shape
             )
 
-            # Construct mask image
-            mask_image = np.stack(
-                [single_channel_mask] * raw_video.shape[-1], axis=0
-            )  # CYX
+            # Construct mask image, padding a single channel
             mask_image = resize_image(
-                mask_image,
+                single_channel_mask[np.newaxis, ...],  # 1YX
                 method="zero",
                 pad_margin_h=[
                     min_y - self.position.min_y,
@@ -0,0 +1,478 @@
+"""Tools to load and save pickled results."""
+
+import concurrent.futures
+import os
+import pickle
+import pickletools
+from functools import partial
+from io import BufferedReader, BytesIO
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from .cell_spot import CellSpot
+from .cell_track import CellTrack, CustomUnPickle
+from .mitosis_track import MitosisTrack
+
+
+def get_consolidated_path(directory: str) -> str:
+    """Get path of the consolidated file gathering all pickles of a directory.
+    It is saved next to the directory, with the same name.
+
+    Parameters
+    ----------
+    directory : str
+        Directory containing one pickle file per object.
+
+    Returns
+    -------
+    str
+        Path of the consolidated file.
+    """
+    return f"{os.path.normpath(directory)}.bin"
+
+
+def is_consolidated_up_to_date(directory: str) -> bool:
+    """Check that the consolidated file of a directory exists and is newer
+    than the directory and all its files. Otherwise, a file may have been
+    written, added or removed since consolidation.
+
+    Parameters
+    ----------
+    directory : str
+        Directory containing one pickle file per object.
+
+    Returns
+    -------
+    bool
+        True if the consolidated file can be used instead of the directory.
+    """
+    consolidated_path = get_consolidated_path(directory)
+    if not os.path.exists(consolidated_path):
+        return False
+    consolidated_time = os.stat(consolidated_path).st_mtime_ns
+    if not os.path.isdir(directory):
+        return True
+    if os.stat(directory).st_mtime_ns > consolidated_time:
+        return False
+    with os.scandir(directory) as entries:
+        return all(
+            entry.stat().st_mtime_ns <= consolidated_time for entry in entries
+        )
+
+
+def load_pickle(
+    path: str,
+    load_function: Callable[[BufferedReader], Any] = pickle.load,
+) -> Any:
+    """Load a single pickle file.
+    File is read with a single call, then unpickled from memory, which avoids
+    many small reads from disk.
+
+    Parameters
+    ----------
+    path : str
+        Path of the pickle file.
+    load_function : Callable[[BufferedReader], Any]
+        Function used to load an object from an opened file.
+
+    Returns
+    -------
+    Any
+        Loaded object.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    return load_function(BytesIO(data))
+
+
+def load_pickle_files(
+    paths: list[str],
+    load_function: Callable[[BufferedReader], Any] = pickle.load,
+) -> list[Any]:
+    """Load a list of pickle files, one object per file.
+    Files are independent, so they are loaded in parallel to overlap disk
+    latency with unpickling. Order of paths is preserved.
+
+    Parameters
+    ----------
+    paths : list[str]
+        Paths of the pickle files.
+    load_function : Callable[[BufferedReader], Any]
+        Function used to load an object from an opened file.
+
+    Returns
+    -------
+    list[Any]
+        Loaded objects.
+    """
+    with concurrent.futures.ThreadPoolExecutor() as e:
+        return list(
+            e.map(partial(load_pickle, load_function=load_function), paths)
+        )
+
+
+def load_pickles(
+    directory: str,
+    load_function: Callable[[BufferedReader], Any] = pickle.load,
+) -> list[Any]:
+    """Load all pickle files of a directory, one object per file.
+    Order of os.scandir is preserved.
+
+    Parameters
+    ----------
+    directory : str
+        Directory containing one pickle file per object.
+    load_function : Callable[[BufferedReader], Any]
+        Function used to load an object from an opened file.
+
+    Returns
+    -------
+    list[Any]
+        Loaded objects.
+    """
+    paths = [entry.path for entry in os.scandir(directory) if entry.is_file()]
+    return load_pickle_files(paths, load_function)
+
+
+def save_consolidated_pickles(objects: list[Any], out_path: str) -> None:
+    """Save a list of objects as a single pickle file.
+
+    Parameters
+    ----------
+    objects : list[Any]
+        Objects to save.
+    out_path : str
+        Path of the consolidated file.
+    """
+    with open(out_path, "wb") as f:
+        pickle.dump(objects, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_consolidated_pickles(
+    path: str,
+    unpickler_class: type[pickle.Unpickler] = pickle.Unpickler,
+    adapt_function: Optional[Callable[[Any], Any]] = None,
+) -> list[Any]:
+    """Load a consolidated pickle file.
+    File is read at once and unpickled from memory, which is much faster than
+    unpickling one file per object.
+
+    Parameters
+    ----------
+    path : str
+        Path of the consolidated file.
+    unpickler_class : type[pickle.Unpickler]
+        Unpickler used to load objects, e.g. to handle renamed classes.
+    adapt_function : Optional[Callable[[Any], Any]]
+        Function applied to each loaded object, e.g. to adapt attributes
+        saved by an older version, so that objects are the same as those
+        loaded one file at a time.
+
+    Returns
+    -------
+    list[Any]
+        Loaded objects.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    objects = unpickler_class(BytesIO(data)).load()
+    if adapt_function is not None:
+        objects = [adapt_function(obj) for obj in objects]
+    return objects
+
+
+def consolidate_pickles(
+    directory: str,
+    out_path: Optional[str] = None,
+    load_function: Callable[[BufferedReader], Any] = pickle.load,
+) -> str:
+    """Gather all pickle files of a directory into a single file.
+    One-time migration: once done, loaders read the consolidated file instead
+    of the directory.
+
+    Parameters
+    ----------
+    directory : str
+        Directory containing one pickle file per object.
+    out_path : Optional[str], optional
+        Path of the consolidated file, by default next to the directory.
+    load_function : Callable[[BufferedReader], Any]
+        Function used to load an object from an opened file.
+
+    Returns
+    -------
+    str
+        Path of the consolidated file.
+    """
+    if out_path is None:
+        out_path = get_consolidated_path(directory)
+    save_consolidated_pickles(load_pickles(directory, load_function), out_path)
+    return out_path
+
+
+def resave_pickles(
+    directory: str,
+    load_function: Callable[[BufferedReader], Any] = pickle.load,
+) -> None:
+    """Re-save all pickle files of a directory with the highest protocol.
+    Streams are optimized to remove unused opcodes, so that files are smaller
+    and faster to load. Useful for files saved by older versions.
+
+    Parameters
+    ----------
+    directory : str
+        Directory containing one pickle file per object.
+    load_function : Callable[[BufferedReader], Any]
+        Function used to load an object from an opened file.
+    """
+    for entry in os.scandir(directory):
+        if not entry.is_file():
+            continue
+        data = pickle.dumps(
+            load_pickle(entry.path, load_function),
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        with open(entry.path, "wb") as f:
+            f.write(pickletools.optimize(data))
+
+
+def update_consolidated_pickles(objects: list[Any], directory: str) -> None:
+    """Keep consolidated file, if any, in sync with objects saved in directory.
+
+    Parameters
+    ----------
+    objects : list[Any]
+        Objects saved in directory.
+    directory : str
+        Directory containing one pickle file per object.
+    """
+    consolidated_path = get_consolidated_path(directory)
+    if os.path.exists(consolidated_path):
+        save_consolidated_pickles(objects, consolidated_path)
+
+
+def load_cell_spots(spots_dir: str, video_name: str) -> list[CellSpot]:
+    """Load cell spots of a video.
+
+    Parameters
+    ----------
+    spots_dir : str
+        Directory where spots are saved.
+    video_name : str
+        Video name.
+
+    Returns
+    -------
+    list[CellSpot]
+        Cell spots.
+    """
+    video_spots_dir = os.path.join(spots_dir, video_name)
+    if is_consolidated_up_to_date(video_spots_dir):
+        return load_consolidated_pickles(
+            get_consolidated_path(video_spots_dir),
+            adapt_function=CellSpot.adapt_deprecated_attributes,
+        )
+    return load_pickles(video_spots_dir, CellSpot.load)
+
+
+def consolidate_cell_spots(spots_dir: str, video_name: str) -> str:
+    """Gather cell spots of a video into a single file. Spots are loaded
+    with CellSpot.load, so that saved objects are adapted.
+
+    Parameters
+    ----------
+    spots_dir : str
+        Directory where spots are saved.
+    video_name : str
+        Video name.
+
+    Returns
+    -------
+    str
+        Path of the consolidated file.
+    """
+    return consolidate_pickles(
+        os.path.join(spots_dir, video_name), load_function=CellSpot.load
+    )
+
+
+def consolidate_cell_tracks(tracks_dir: str, video_name: str) -> str:
+    """Gather cell tracks of a video into a single file. Tracks are loaded
+    with CellTrack.load, so that renamed classes are handled and saved
+    objects are adapted.
+
+    Parameters
+    ----------
+    tracks_dir : str
+        Directory where tracks are saved.
+    video_name : str
+        Video name.
+
+    Returns
+    -------
+    str
+        Path of the consolidated file.
+    """
+    return consolidate_pickles(
+        os.path.join(tracks_dir, video_name), load_function=CellTrack.load
+    )
+
+
+def load_cell_tracks(tracks_dir: str, video_name: str) -> list[CellTrack]:
+    """Load cell tracks of a video.
+
+    Parameters
+    ----------
+    tracks_dir : str
+        Directory where tracks are saved.
+    video_name : str
+        Video name.
+
+    Returns
+    -------
+    list[CellTrack]
+        Cell tracks.
+    """
+    video_tracks_dir = os.path.join(tracks_dir, video_name)
+    if is_consolidated_up_to_date(video_tracks_dir):
+        return load_consolidated_pickles(
+            get_consolidated_path(video_tracks_dir),
+            CustomUnPickle,
+            CellTrack.adapt_deprecated_attributes,
+        )
+    return load_pickles(video_tracks_dir, CellTrack.load)
+
+
+def get_mitosis_track_paths(
+    mitoses_dir: str, video_name: Optional[str] = None
+) -> list[str]:
+    """Get paths of mitosis tracks saved in a directory.
+
+    Parameters
+    ----------
+    mitoses_dir : str
+        Directory where mitosis tracks are saved.
+    video_name : Optional[str], optional
+        If provided, only mitosis tracks of this video are kept.
+
+    Returns
+    -------
+    list[str]
+        Paths of mitosis tracks.
+    """
+    # Entries give full paths and file type without extra system calls
+    with os.scandir(mitoses_dir) as entries:
+        return [
+            entry.path
+            for entry in entries
+            if (video_name is None or video_name in entry.name)
+            and entry.is_file()
+        ]
+
+
+def load_mitosis_tracks(
+    mitoses_dir: str, video_name: Optional[str] = None
+) -> list[MitosisTrack]:
+    """Load mitosis tracks saved in a directory, in parallel.
+
+    Parameters
+    ----------
+    mitoses_dir : str
+        Directory where mitosis tracks are saved.
+    video_name : Optional[str], optional
+        If provided, only mitosis tracks of this video are loaded.
+
+    Returns
+    -------
+    list[MitosisTrack]
+        Mitosis tracks.
+    """
+    return load_pickle_files(
+        get_mitosis_track_paths(mitoses_dir, video_name), MitosisTrack.load
+    )
+
+
+def get_segmentation_array_path(segmentation_results_path: str) -> str:
+    """Get path of the .npy copy of pickled segmentation results.
+
+    Parameters
+    ----------
+    segmentation_results_path : str
+        Path of the pickled segmentation results.
+
+    Returns
+    -------
+    str
+        Path of the .npy file, next to the pickle file.
+    """
+    return f"{os.path.splitext(segmentation_results_path)[0]}.npy"
+
+
+def downcast_labels(labels: np.ndarray) -> np.ndarray:
+    """Cast labels to the smallest unsigned integer type able to hold them.
+
+    Parameters
+    ----------
+    labels : np.ndarray
+        Label image, with non-negative values.
+
+    Returns
+    -------
+    np.ndarray
+        Label image, with smallest possible dtype.
+    """
+    labels = np.asarray(labels)
+    if labels.size == 0:
+        return labels
+    return labels.astype(np.min_scalar_type(labels.max()), copy=False)
+
+
+def convert_segmentation_results(segmentation_results_path: str) -> str:
+    """Save pickled segmentation results as a .npy file, which can then be
+    memory-mapped. One-time conversion.
+
+    Parameters
+    ----------
+    segmentation_results_path : str
+        Path of the pickled segmentation results.
+
+    Returns
+    -------
+    str
+        Path of the .npy file.
+    """
+    with open(segmentation_results_path, "rb") as f:
+        segmentation_results = pickle.load(f)  # TYX
+    out_path = get_segmentation_array_path(segmentation_results_path)
+    np.save(out_path, downcast_labels(segmentation_results))
+    return out_path
+
+
+def load_segmentation_results(segmentation_results_path: str) -> np.ndarray:
+    """Load segmentation results.
+    If converted, and not older than the pickle file, the .npy file is
+    memory-mapped so that only accessed frames are read from disk. Otherwise,
+    the whole pickle file is loaded. In both cases, labels use the smallest
+    possible dtype.
+
+    Parameters
+    ----------
+    segmentation_results_path : str
+        Path of the pickled segmentation results.
+
+    Returns
+    -------
+    np.ndarray
+        Segmentation results. TYX.
+    """
+    array_path = get_segmentation_array_path(segmentation_results_path)
+    # Ignore .npy file if pickle file was regenerated after conversion
+    if os.path.exists(array_path) and (
+        not os.path.exists(segmentation_results_path)
+        or os.path.getmtime(array_path)
+        >= os.path.getmtime(segmentation_results_path)
+    ):
+        return np.load(array_path, mmap_mode="r")
+    with open(segmentation_results_path, "rb") as f:
+        return downcast_labels(pickle.load(f))
@@ -1,3 +1,6 @@
+from typing import Union
+from numba import njit
+from scipy import ndimage
 from skimage.measure import find_contours
 import numpy as np
 
@@ -21,33 +24,33 @@ def get_spots_from_frame(
     list[CellSpot]
         List of cell spots.
     """
-    # Pad cellpose results to ensure that the contours are closed
-    max_cellpose = np.max(cellpose_result)
-    padded_cellpose_result = np.pad(
-        cellpose_result, pad_width=1, mode="constant"
-    )
-
     cell_spots = []
-    for i in range(1, max_cellpose + 1):
-        contours = find_contours(padded_cellpose_result == i)
+    # Bounding box of each cell, to process only its neighborhood
+    cell_slices = ndimage.find_objects(cellpose_result)
+    for i, cell_slice in enumerate(cell_slices, start=1):
+        if cell_slice is None:  # missing label
+            continue
+        # Pad cell crop to ensure that the contours are closed
+        padded_cell_mask = np.pad(
+            cellpose_result[cell_slice] == i, pad_width=1, mode="constant"
+        )
+        contours = find_contours(padded_cell_mask)
         sorted_contours = sorted(
             contours,
             key=lambda contour: contour.shape[0],
             reverse=True,
         )
-        # -1 to remove padding
-        list_y = [int(l[0] - 1) for l in sorted_contours[0]]
-        list_x = [int(l[1] - 1) for l in sorted_contours[0]]
-        abs_min_x, abs_max_x, abs_min_y, abs_max_y = (
-            np.abs(np.min(list_x)),
-            np.abs(np.max(list_x)),
-            np.abs(np.min(list_y)),
-            np.abs(np.max(list_y)),
-        )
-        # Compute cell centroid
+        # -1 to remove padding, then move back to frame coordinates
+        contour = (
+            sorted_contours[0] - 1 + [cell_slice[0].start, cell_slice[1].start]
+        ).astype(int)
+        # Bounding box, contour coordinates are non-negative
+        abs_min_y, abs_min_x = contour.min(axis=0)
+        abs_max_y, abs_max_x = contour.max(axis=0)
+        # Compute cell centroid, from contour arrays
         cell_centroid = centroid(
-            list_y,
-            list_x,
+            contour[:, 0],
+            contour[:, 1],
         )  # (y, x)
         cell_spot = CellSpot(
             frame,
@@ -58,61 +61,82 @@ def get_spots_from_frame(
             abs_max_x,
             abs_min_y,
             abs_max_y,
-            [[x, y] for x, y in zip(list_x, list_y)],
+            contour[:, ::-1].tolist(),  # (x, y)
         )
         cell_spots.append(cell_spot)
 
     return frame, cell_spots
 
 
-def signed_area(x: list[float], y: list[float]) -> float:
+@njit(cache=True)
+def _shoelace_sums(x: np.ndarray, y: np.ndarray) -> tuple[float, float, float]:
+    """Compute, in a single pass, the sums needed by the shoelace formula.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        x-coordinates of the polygon.
+    y : np.ndarray
+        y-coordinates of the polygon.
+
+    Returns
+    -------
+    tuple[float, float, float]
+        Signed area, and x and y centroid numerators.
+    """
+    n = x.shape[0]
+    a, ax, ay = 0.0, 0.0, 0.0
+    for i in range(n):
+        j = i + 1 if i < n - 1 else 0  # close polygon
+        w = x[i] * y[j] - x[j] * y[i]
+        a += w
+        ax += (x[i] + x[j]) * w
+        ay += (y[i] + y[j]) * w
+    return a / 2.0, ax, ay
+
+
+def signed_area(
+    x: Union[list[float], np.ndarray], y: Union[list[float], np.ndarray]
+) -> float:
     """Compute the signed area of a polygon.
 
     Parameters
     ----------
-    x : list[float]
-        List of x-coordinates of the polygon.
-    y : list[float]
-        List of y-coordinates of the polygon.
+    x : Union[list[float], np.ndarray]
+        x-coordinates of the polygon.
+    y : Union[list[float], np.ndarray]
+        y-coordinates of the polygon.
 
     Returns
     -------
     float
         Signed area of the polygon.
     """
-    n = len(x)
-    a = 0.0
-    for i in range(n - 1):
-        a += x[i] * y[i + 1] - x[i + 1] * y[i]
-    return (a + x[n - 1] * y[0] - x[0] * y[n - 1]) / 2.0
+    area, _, _ = _shoelace_sums(
+        np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    )
+    return area
 
 
-def centroid(x: list[float], y: list[float]) -> list[float]:
+def centroid(
+    x: Union[list[float], np.ndarray], y: Union[list[float], np.ndarray]
+) -> list[float]:
     """Calculate the centroid of a polygon.
 
     Parameters
     ----------
-    x : list[float]
-        List of x-coordinates of the polygon.
-    y : list[float]
-        List of y-coordinates of the polygon.
+    x : Union[list[float], np.ndarray]
+        x-coordinates of the polygon.
+    y : Union[list[float], np.ndarray]
+        y-coordinates of the polygon.
 
     Returns
     -------
     list[float]
         Coordinates of the centroid of the polygon.
     """
-    area = signed_area(x, y)
-    ax = 0.0
-    ay = 0.0
-    n = len(x)
-    for i in range(n - 1):
-        w = x[i] * y[i + 1] - x[i + 1] * y[i]
-        ax += (x[i] + x[i + 1]) * w
-        ay += (y[i] + y[i + 1]) * w
-
-    w0 = x[n - 1] * y[0] - x[0] * y[n - 1]
-    ax += (x[n - 1] + x[0]) * w0
-    ay += (y[n - 1] + y[0]) * w0
+    area, ax, ay = _shoelace_sums(
+        np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    )
 
     return [int(ax / 6.0 / area), int(ay / 6.0 / area)]
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+import math
 import numpy as np
 
 
@@ -17,11 +18,42 @@ class Spot(ABC):
         Y coordinate of the spot.
     """
 
+    # Spots are created in large numbers, so that common attributes are
+    # stored in slots. "__dict__" is kept for attributes of old versions
+    # and subclasses without slots.
+    __slots__ = ("frame", "x", "y", "__dict__")
+
     def __init__(self, frame: int, x: int, y: int):
         self.frame = frame
         self.x = x
         self.y = y
 
+    def __getstate__(self) -> dict:
+        """Pickle all attributes as a single dict, as in older versions.
+
+        Returns
+        -------
+        dict
+            Attributes of the spot.
+        """
+        state = dict(getattr(self, "__dict__", {}))
+        for cls in type(self).__mro__:
+            for key in cls.__dict__.get("__slots__", ()):
+                if key != "__dict__" and hasattr(self, key):
+                    state[key] = getattr(self, key)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Restore attributes when unpickling.
+
+        Parameters
+        ----------
+        state : dict
+            Attributes of the spot.
+        """
+        for key, value in state.items():
+            setattr(self, key, value)
+
     def get_position(self) -> np.ndarray:
         """Return position as numpy array.
 
@@ -47,8 +79,10 @@ class Spot(ABC):
         float
             Distance between two spots.
         """
-        return np.linalg.norm(
-            np.array(self.get_position()) - np.array(other_spot.get_position())
+        position = self.get_position()
+        other_position = other_spot.get_position()
+        return math.hypot(
+            position[0] - other_position[0], position[1] - other_position[1]
         )
 
     def temporal_distance_to(self, other_spot: Spot) -> float:
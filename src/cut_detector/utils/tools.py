@@ -28,6 +28,7 @@ from cnn_framework.utils.model_params.base_model_params import BaseModelParams
 from .mitosis_track import MitosisTrack
 from .cnn_data_set import CnnDataSet
 from .hidden_markov_models import HiddenMarkovModel
+from .pickle_tools import load_mitosis_tracks
 
 
 def re_organize_channels(image: np.ndarray) -> np.ndarray:
@@ -126,18 +127,10 @@ def upload_annotations(
     # Read video
     video_name = os.path.basename(video_path).split(".")[0]
 
-    mitosis_tracks: list[MitosisTrack] = []
-    # Iterate over "bin" files in exported_mitoses_dir
-    for state_path in os.listdir(mitoses_folder):
-        # Ignore if not for current video
-        if video_name not in state_path:
-            continue
-        # Load mitosis track
-        with open(os.path.join(mitoses_folder, state_path), "rb") as f:
-            mitosis_track = MitosisTrack.load(f)
-
-        # Add mitosis track to list
-        mitosis_tracks.append(mitosis_track)
+    # Load mitosis tracks of current video from "bin" files
+    mitosis_tracks: list[MitosisTrack] = load_mitosis_tracks(
+        mitoses_folder, video_name
+    )
 
     # Get all files in annotations_folder
     annotations_files = []
@@ -167,7 +160,9 @@ def upload_annotations(
                     state_path,
                 )
                 with open(save_path, "wb") as f:
-                    pickle.dump(mitosis_track, f)
+                    pickle.dump(
+                        mitosis_track, f, protocol=pickle.HIGHEST_PROTOCOL
+                    )
 
             # Evaluate mid-body detection (ignore triple divisions)
             if len(mitosis_track.daughter_track_ids) == 1:
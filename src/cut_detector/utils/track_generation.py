@@ -6,8 +6,10 @@ See Track documentation to learn how to create new specialized Tracks/Spots
 
 from typing import Tuple, TypeVar
 
+import numpy as np
 import pandas as pd
 from laptrack import LapTrack
+from laptrack.data_conversion import convert_tree_to_dataframe
 
 from .track import Track
 from .spot import Spot
@@ -54,8 +56,8 @@ def generate_tracks_from_spots(
     )
     inferred_track_kind: T = infer_specialized_track_kind(inferred_spot_kind)
 
-    spot_df = convert_spots_to_spotdf(spot_dict, inferred_spot_kind)
-    track_df, _, _ = apply_tracking(inferred_spot_kind, spot_df, method)
+    coords, min_frame = convert_spots_to_coords(spot_dict, inferred_spot_kind)
+    track_df = apply_tracking(coords, min_frame, method)
     track_list = inferred_track_kind.track_df_to_track_list(
         track_df, spot_dict
     )
@@ -158,10 +160,10 @@ def infer_specialized_track_kind(spot_kind: type[Spot]) -> type[Track]:
     return inferred_specialized_track_kind
 
 
-def convert_spots_to_spotdf(
+def convert_spots_to_coords(
     spot_dict: dict[int, list[Spot]], spot_kind: type[Spot]
-) -> pd.DataFrame:
-    """Converts a dictionary of spots to a DataFrame.
+) -> Tuple[list[np.ndarray], int]:
+    """Converts a dictionary of spots to LapTrack coordinates.
 
     Parameters
     ----------
@@ -172,73 +174,71 @@ def convert_spots_to_spotdf(
 
     Returns
     -------
-    pd.DataFrame
-        A DataFrame containing the spots
+    list[np.ndarray]
+        One array per frame, from first to last frame, with spots
+        coordinates and extra features as columns, in spot order
+    int
+        The first frame
     """
-
-    cols = [
-        "frame",
-        "x",
-        "y",
-        "idx_in_frame",
-    ]
-
-    cols.extend(spot_kind.get_extra_features_name())
-
-    spot_df = pd.DataFrame({c: [] for c in cols})
-
-    for frame, spots in spot_dict.items():
+    nb_cols = 2 + len(spot_kind.get_extra_features_name())
+    min_frame, max_frame = min(spot_dict), max(spot_dict)
+    coords = []
+    for frame in range(min_frame, max_frame + 1):
+        spots = spot_dict.get(frame, [])
         if len(spots) == 0:
-            spot_df.loc[len(spot_df.index)] = [
-                frame,
-                *[
-                    None for _ in range(len(cols) - 1)
-                ],  # fills the rest of the cols with None
-            ]
-        else:
-            for idx, spot in enumerate(spots):
-                assert (
-                    spot.frame == frame
-                ), "spot.frame and frame cols must be the same"
-                features = [spot.frame, spot.x, spot.y, idx]
-                features.extend(spot.get_extra_coordinates())
-                spot_df.loc[len(spot_df.index)] = features
-
-    # Cast frame to int for laptrack
-    spot_df["frame"] = spot_df["frame"].astype(int)
-
-    return spot_df
+            # Empty frames hold a single NaN spot, removed after tracking
+            coords.append(np.full((1, nb_cols), np.nan))
+            continue
+        for spot in spots:
+            assert (
+                spot.frame == frame
+            ), "spot.frame and frame key must be the same"
+        coords.append(
+            np.array(
+                [
+                    [spot.x, spot.y] + spot.get_extra_coordinates()
+                    for spot in spots
+                ],
+                dtype=np.float64,
+            )
+        )
+    return coords, min_frame
 
 
 def apply_tracking(
-    spot_kind: type[Spot],
-    spot_df: pd.DataFrame,
-    method: LapTrack,
-) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
-    """Applies the tracking method to the spot DataFrame.
+    coords: list[np.ndarray], min_frame: int, method: LapTrack
+) -> pd.DataFrame:
+    """Applies the tracking method to the spots coordinates.
 
     Parameters
     ----------
-    spot_kind : type[Spot]
-        The kind of spot
-    spot_df : pd.DataFrame
-        A DataFrame containing the spots
+    coords : list[np.ndarray]
+        One array of spots coordinates per frame
+    min_frame : int
+        The first frame
     method : LapTrack
         The tracking method to use
 
     Returns
     -------
-    Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]
-        A tuple containing the DataFrame of the tracks, the DataFrame of the
-        tracks' features, and the DataFrame of the tracks' links
+    pd.DataFrame
+        A DataFrame of the tracks, with frame, idx_in_frame, track_id and
+        tree_id columns, sorted by frame and index in frame
     """
-    coord_cols = ["x", "y"]
-    coord_cols.extend(spot_kind.get_extra_features_name())
-
-    tuple_df = method.predict_dataframe(
-        spot_df,
-        coord_cols,
-        only_coordinate_cols=False,
+    tree = method.predict(coords)
+    track_df, _, _ = convert_tree_to_dataframe(tree)
+    track_df = (
+        track_df.sort_index()
+        .reset_index()
+        .rename(columns={"index": "idx_in_frame"})
     )
+    # Remove NaN spots of empty frames
+    empty_frames = [
+        frame
+        for frame, frame_coords in enumerate(coords)
+        if np.isnan(frame_coords).all()
+    ]
+    track_df = track_df[~track_df["frame"].isin(empty_frames)]
+    track_df["frame"] += min_frame
 
-    return tuple_df
+    return track_df
@@ -1,3 +1,4 @@
+import concurrent.futures
 import os
 import pickle
 from typing import Optional
@@ -10,7 +11,62 @@ from ..factories.mid_body_detection_factory import MidBodyDetectionFactory
 
 from ..utils.mitosis_track import MitosisTrack
 from ..utils.cell_track import CellTrack
+from ..utils.image_tools import quantize_to_uint8
 from ..utils.parameters import Parameters
+from ..utils.pickle_tools import load_cell_tracks, load_mitosis_tracks
+
+# Maximum number of results waiting to be written to disk
+MAX_PENDING_WRITES = 4
+
+
+def _save_mitosis_track(mitosis_track: MitosisTrack, save_path: str) -> None:
+    """Save mitosis track as a pickle file.
+
+    Parameters
+    ----------
+    mitosis_track : MitosisTrack
+        Mitosis track to save.
+    save_path : str
+        Path of the pickle file.
+    """
+    with open(save_path, "wb") as f:
+        pickle.dump(mitosis_track, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _save_mitosis_movie(mitosis_movie: np.ndarray, save_path: str) -> None:
+    """Save mitosis movie as an OME-TIFF file.
+
+    Parameters
+    ----------
+    mitosis_movie : np.ndarray
+        Mitosis movie. TCYX.
+    save_path : str
+        Path of the OME-TIFF file.
+    """
+    OmeTiffWriter.save(mitosis_movie, save_path, dim_order="TCYX")
+
+
+def _quantize_mitosis_movie(mitosis_movie: np.ndarray) -> np.ndarray:
+    """Quantize mitosis movie to uint8, for smaller and faster saving.
+    Image channels are normalized, while last channel, with mask and
+    mid-body labels, is kept as is.
+
+    Parameters
+    ----------
+    mitosis_movie : np.ndarray
+        Mitosis movie. TCYX, with mask and mid-body as last channel.
+
+    Returns
+    -------
+    np.ndarray
+        Quantized mitosis movie. TCYX.
+    """
+    quantized_movie = np.empty(mitosis_movie.shape, dtype=np.uint8)
+    quantized_movie[:, :-1] = quantize_to_uint8(
+        mitosis_movie[:, :-1], channel_axis=1
+    )
+    quantized_movie[:, -1] = mitosis_movie[:, -1]
+    return quantized_movie
 
 
 def perform_mid_body_detection(
@@ -23,6 +79,7 @@ def perform_mid_body_detection(
     parallel_detection: bool = False,
     detection_method: str = "difference_gaussian",
     target_mitosis_id: Optional[int] = None,
+    quantize_movies: bool = False,
     params=Parameters(),
 ) -> list[MitosisTrack]:
     """Perform mid-body detection on mitosis tracks.
@@ -47,6 +104,8 @@ def perform_mid_body_detection(
         Detection method to use, by default "difference_gaussian".
     target_mitosis_id : Optional[int], optional
         Target mitosis id to perform mid-body detection on, by default None.
+    quantize_movies : bool, optional
+        Save mitosis movies as uint8 for visualization, by default False.
     params : Parameters, optional
         Video parameters.
 
@@ -55,86 +114,92 @@ def perform_mid_body_detection(
     list[MitosisTrack]
         List of updated mitosis tracks.
     """
-    mitosis_tracks: list[MitosisTrack] = []
-    # Iterate over "bin" files in exported_mitoses_dir
-    for state_path in os.listdir(exported_mitoses_dir):
-        # Ignore if not for current video
-        if video_name not in state_path:
-            continue
-        # Load mitosis track
-        with open(os.path.join(exported_mitoses_dir, state_path), "rb") as f:
-            mitosis_track = MitosisTrack.load(f)
-
-        # Add mitosis track to list
-        mitosis_tracks.append(mitosis_track)
+    # Load mitosis tracks of current video from "bin" files
+    mitosis_tracks: list[MitosisTrack] = load_mitosis_tracks(
+        exported_mitoses_dir, video_name
+    )
 
     # Load cell tracks
-    cell_tracks: list[CellTrack] = []
-    # Iterate over "bin" files in exported_tracks_dir
-    video_exported_tracks_dir = os.path.join(exported_tracks_dir, video_name)
-    for state_path in os.listdir(video_exported_tracks_dir):
-        # Load mitosis track
-        with open(
-            os.path.join(video_exported_tracks_dir, state_path), "rb"
-        ) as f:
-            cell_track = CellTrack.load(f)
-            cell_tracks.append(cell_track)
+    cell_tracks: list[CellTrack] = load_cell_tracks(
+        exported_tracks_dir, video_name
+    )
 
     print("\n### MID-BODY DETECTION ###")
 
     # Generate movie for each mitosis and save
     print("Performing mid-body detection.")
     mid_body_detector = MidBodyDetectionFactory(params)
-    for i, mitosis_track in enumerate(tqdm(mitosis_tracks)):
-
-        if (
-            isinstance(target_mitosis_id, int)
-            and mitosis_track.id != target_mitosis_id
-        ):
-            print(
-                f"\nTrack {i+1}/{len(mitosis_tracks)}, Mitosis id {mitosis_track.id} - Skipped"
-            )
-            continue
-
-        # Generate mitosis movie
-        mitosis_movie, mask_movie = mitosis_track.generate_video_movie(
-            raw_video
-        )  # TYXC, TYX
-
-        # Search for mid-body in mitosis movie
-        mid_body_detector.update_mid_body_spots(
-            mitosis_track,
-            mitosis_movie,
-            cell_tracks,
-            parallel_detection=parallel_detection,
-            detection_method=detection_method,
-        )
-
-        # Save updated mitosis track
-        if save:
-            state_path = f"{mitosis_track.get_file_name(video_name)}.bin"
-            save_path = os.path.join(
-                exported_mitoses_dir,
-                state_path,
-            )
-            with open(save_path, "wb") as f:
-                pickle.dump(mitosis_track, f)
-
-        if movies_save_dir:
-            # Save mitosis movie
-            final_mitosis_movie = mitosis_track.add_mid_body_movie(
-                mitosis_movie, mask_movie
-            )  # TYX C=C+1
-            image_save_path = os.path.join(
-                movies_save_dir,
-                f"{mitosis_track.get_file_name(video_name)}.tiff",
-            )
-            # Transpose to match TCYX
-            final_mitosis_movie = np.transpose(
-                final_mitosis_movie, (0, 3, 1, 2)
-            )
-            OmeTiffWriter.save(
-                final_mitosis_movie, image_save_path, dim_order="TCYX"
+    # Results are written by a background thread, so that detection of next
+    # mitosis is not blocked by disk I/O
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as writer:
+        pending_writes: list[concurrent.futures.Future] = []
+        for i, mitosis_track in enumerate(tqdm(mitosis_tracks)):
+
+            if (
+                isinstance(target_mitosis_id, int)
+                and mitosis_track.id != target_mitosis_id
+            ):
+                print(
+                    f"\nTrack {i+1}/{len(mitosis_tracks)}, Mitosis id {mitosis_track.id} - Skipped"
+                )
+                continue
+
+            # Generate mitosis movie
+            mitosis_movie, mask_movie = mitosis_track.generate_video_movie(
+                raw_video
+            )  # TYXC, TYX
+
+            # Search for mid-body in mitosis movie
+            mid_body_detector.update_mid_body_spots(
+                mitosis_track,
+                mitosis_movie,
+                cell_tracks,
+                parallel_detection=parallel_detection,
+                detection_method=detection_method,
             )
 
+            # Save updated mitosis track
+            if save:
+                state_path = f"{mitosis_track.get_file_name(video_name)}.bin"
+                save_path = os.path.join(
+                    exported_mitoses_dir,
+                    state_path,
+                )
+                pending_writes.append(
+                    writer.submit(
+                        _save_mitosis_track, mitosis_track, save_path
+                    )
+                )
+
+            if movies_save_dir:
+                # Save mitosis movie
+                final_mitosis_movie = mitosis_track.add_mid_body_movie(
+                    mitosis_movie, mask_movie
+                )  # TYX C=C+1
+                image_save_path = os.path.join(
+                    movies_save_dir,
+                    f"{mitosis_track.get_file_name(video_name)}.tiff",
+                )
+                # Move channels to match TCYX, as a view without copy
+                final_mitosis_movie = np.moveaxis(final_mitosis_movie, 3, 1)
+                if quantize_movies:
+                    final_mitosis_movie = _quantize_mitosis_movie(
+                        final_mitosis_movie
+                    )
+                pending_writes.append(
+                    writer.submit(
+                        _save_mitosis_movie,
+                        final_mitosis_movie,
+                        image_save_path,
+                    )
+                )
+
+            # Limit memory held by movies waiting to be written
+            while len(pending_writes) > MAX_PENDING_WRITES:
+                pending_writes.pop(0).result()
+
+        # Wait for remaining writes, and raise their errors if any
+        for pending_write in pending_writes:
+            pending_write.result()
+
     return mitosis_tracks
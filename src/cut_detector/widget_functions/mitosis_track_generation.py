@@ -12,6 +12,11 @@ from ..factories.mitosis_track_generation_factory import (
 )
 from ..models.tools import get_model_path
 from ..utils.mitosis_track import MitosisTrack
+from ..utils.pickle_tools import (
+    load_cell_spots,
+    load_cell_tracks,
+    update_consolidated_pickles,
+)
 
 
 def perform_mitosis_track_generation(
@@ -75,21 +80,10 @@ def perform_mitosis_track_generation(
     # Create factory instance, where useful functions are defined
     tracks_merging_factory = MitosisTrackGenerationFactory(params)
 
-    # Load cell spots
-    cell_spots: list[CellSpot] = []
-    video_spots_save_dir = os.path.join(spots_dir, video_name)
-    for state_path in os.listdir(video_spots_save_dir):
-        with open(os.path.join(video_spots_save_dir, state_path), "rb") as f:
-            cell_spot = CellSpot.load(f)
-            cell_spots.append(cell_spot)
-
-    # Load cell tracks
-    cell_tracks: list[CellTrack] = []
+    # Load cell spots and tracks
+    cell_spots = load_cell_spots(spots_dir, video_name)
+    cell_tracks = load_cell_tracks(tracks_dir, video_name)
     video_tracks_save_dir = os.path.join(tracks_dir, video_name)
-    for state_path in os.listdir(video_tracks_save_dir):
-        with open(os.path.join(video_tracks_save_dir, state_path), "rb") as f:
-            cell_track = CellTrack.load(f)
-            cell_tracks.append(cell_track)
 
     # Detect metaphase spots
     tracks_merging_factory.pre_process_spots(
@@ -134,7 +128,7 @@ def perform_mitosis_track_generation(
                 state_path,
             )
             with open(save_path, "wb") as f:
-                pickle.dump(mitosis_track, f)
+                pickle.dump(mitosis_track, f, protocol=pickle.HIGHEST_PROTOCOL)
 
     # Save updated cell tracks
     if save:
@@ -145,6 +139,7 @@ def perform_mitosis_track_generation(
                 state_path,
             )
             with open(save_path, "wb") as f:
-                pickle.dump(cell_track, f)
+                pickle.dump(cell_track, f, protocol=pickle.HIGHEST_PROTOCOL)
+        update_consolidated_pickles(cell_tracks, video_tracks_save_dir)
 
     return mitosis_tracks, cell_spots, cell_tracks
@@ -7,6 +7,7 @@ from ..utils.parameters import Parameters
 from ..factories.mt_cut_detection_factory import MtCutDetectionFactory
 from ..models.tools import get_model_path
 from ..utils.mitosis_track import MitosisTrack
+from ..utils.pickle_tools import load_mitosis_tracks
 
 
 def perform_mt_cut_detection(
@@ -43,18 +44,10 @@ def perform_mt_cut_detection(
     """
     print("\n### MICRO-TUBULES CUT DETECTION ###")
 
-    mitosis_tracks: list[MitosisTrack] = []
-    # Iterate over "bin" files in exported_mitoses_dir
-    for state_path in os.listdir(exported_mitoses_dir):
-        # Ignore if not for current video
-        if video_name not in state_path:
-            continue
-        # Load mitosis track
-        with open(os.path.join(exported_mitoses_dir, state_path), "rb") as f:
-            mitosis_track = MitosisTrack.load(f)
-
-        # Add mitosis track to list
-        mitosis_tracks.append(mitosis_track)
+    # Load mitosis tracks of current video from "bin" files
+    mitosis_tracks: list[MitosisTrack] = load_mitosis_tracks(
+        exported_mitoses_dir, video_name
+    )
 
     # Perform cut detection
     mt_cut_detector = MtCutDetectionFactory(params)
@@ -74,6 +67,6 @@ def perform_mt_cut_detection(
                 state_path,
             )
             with open(save_path, "wb") as f:
-                pickle.dump(mitosis_track, f)
+                pickle.dump(mitosis_track, f, protocol=pickle.HIGHEST_PROTOCOL)
 
     return mitosis_tracks
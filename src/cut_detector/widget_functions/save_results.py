@@ -12,6 +12,11 @@ from ..utils.image_tools import resize_image
 from ..utils.cell_track import CellTrack
 from ..factories.results_saving_factory import ResultsSavingFactory
 from ..utils.mitosis_track import MitosisTrack
+from ..utils.pickle_tools import (
+    get_mitosis_track_paths,
+    load_mitosis_tracks,
+    load_pickle_files,
+)
 
 
 def perform_results_saving(
@@ -52,14 +57,14 @@ def perform_results_saving(
     if save_dir is not None and not os.path.exists(save_dir):
         os.makedirs(save_dir)
 
-    mitosis_tracks: list[MitosisTrack] = []
-    mitosis_video_names: list[str] = []
-    # Iterate over "bin" files in exported_mitoses_dir
-    for state_path in os.listdir(exported_mitoses_dir):
-        with open(os.path.join(exported_mitoses_dir, state_path), "rb") as f:
-            mitosis_track = MitosisTrack.load(f)
-            mitosis_tracks.append(mitosis_track)
-            mitosis_video_names.append(state_path.split("_mitosis_")[0])
+    # Load "bin" files in exported_mitoses_dir
+    mitosis_paths = get_mitosis_track_paths(exported_mitoses_dir)
+    mitosis_tracks: list[MitosisTrack] = load_pickle_files(
+        mitosis_paths, MitosisTrack.load
+    )
+    mitosis_video_names: list[str] = [
+        os.path.basename(path).split("_mitosis_")[0] for path in mitosis_paths
+    ]
 
     # Define lists and dictionaries to store results
     results_saving_factory = ResultsSavingFactory(params=params)
@@ -113,18 +118,10 @@ def save_galleries(
     save_dir : str
         Directory where to save results.
     """
-    mitosis_tracks: list[MitosisTrack] = []
-    # Iterate over "bin" files in exported_mitoses_dir
-    for state_path in os.listdir(exported_mitoses_dir):
-        # Ignore if not for current video
-        if video_name not in state_path:
-            continue
-        # Load mitosis track
-        with open(os.path.join(exported_mitoses_dir, state_path), "rb") as f:
-            mitosis_track = MitosisTrack.load(f)
-
-        # Add mitosis track to list
-        mitosis_tracks.append(mitosis_track)
+    # Load mitosis tracks of current video from "bin" files
+    mitosis_tracks: list[MitosisTrack] = load_mitosis_tracks(
+        exported_mitoses_dir, video_name
+    )
 
     # Classify mitosis tracks depending on detection status
     classified_mitosis_tracks: dict[str, list[MitosisTrack]] = {}
@@ -4,6 +4,7 @@ from typing import Optional
 import numpy as np
 from ..utils.cell_spot import CellSpot
 from ..utils.cell_track import CellTrack
+from ..utils.pickle_tools import update_consolidated_pickles
 from ..factories.segmentation_tracking_factory import (
     SegmentationTrackingFactory,
 )
@@ -78,7 +79,8 @@ def perform_tracking(
             state_path,
         )
         with open(save_path, "wb") as f:
-            pickle.dump(cell_spot, f)
+            pickle.dump(cell_spot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    update_consolidated_pickles(cell_spots, video_spots_save_dir)
 
     # Save cell tracks
     for cell_track in cell_tracks:
@@ -88,6 +90,7 @@ def perform_tracking(
             state_path,
         )
         with open(save_path, "wb") as f:
-            pickle.dump(cell_track, f)
+            pickle.dump(cell_track, f, protocol=pickle.HIGHEST_PROTOCOL)
+    update_consolidated_pickles(cell_tracks, video_tracks_save_dir)
 
     return cell_spots, cell_tracks, segmentation_results